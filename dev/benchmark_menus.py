@@ -0,0 +1,383 @@
+"""
+Pygame Menu System Benchmark Script
+
+Times the parts of the menu system that decide how fast a menu runs, without
+opening a window. Results are printed as JSON, so runs of different versions
+can be compared:
+
+    python benchmark_menus.py --output before.json
+    python benchmark_menus.py --output after.json
+
+Every benchmark is run several times and the fastest, median and average
+time in milliseconds are reported. Run it from the dev directory, like
+test_menus.py.
+"""
+
+# Imports
+import os
+
+# No window is needed, and the JSON output must not start with pygame's
+# banner. These have to be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import tempfile
+import time
+
+import pygame
+
+import menus_dev
+from menus_dev import MenuManager, Page, ButtonText, Text
+
+# Constants
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+PAGE_SIZES = (10, 100, 1000)
+HIGHSCORE_FILE_SIZES = (0, 1000, 10000, 100000)
+CLICKS = 1000
+SET_TEXT_CALLS = 1000
+HIGHSCORE_SAVES = 100
+DEFAULT_REPEAT = 5
+
+def time_runs (function, repeat):
+    """
+    Run a function several times and time each run.
+
+    Positional Arguments:
+        function (function reference): Function taking no arguments.
+        repeat (int): Number of runs.
+
+    Returns:
+        dict: Fastest, median and average run time in milliseconds, and the
+              number of runs.
+    """
+
+    times = list()
+
+    for run in range(repeat):
+
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+
+    return {"min_ms": min(times), "median_ms": statistics.median(times),
+            "mean_ms": statistics.mean(times), "runs": repeat}
+
+def clear_caches ():
+    """
+    Empty the shared caches of the menu system, so a benchmark starts cold.
+    """
+
+    menus_dev.text_cache.clear()
+    menus_dev.font_registry.clear()
+
+def build_page (num_elements, baked = False):
+    """
+    Build a page filled with a grid of text buttons, with a text element for
+    every tenth element.
+
+    Positional Arguments:
+        num_elements (int): Number of elements on the page.
+
+    Keyword Arguments:
+        baked (boolean): Make a baked page. Default is False.
+
+    Returns:
+        Page: The new page.
+    """
+
+    page = Page("bench_" + str(num_elements), baked = baked)
+    columns = max(int(num_elements ** 0.5), 1)
+    width = SCREEN_WIDTH // columns
+    height = SCREEN_HEIGHT // (num_elements // columns + 1)
+    font = ("Arial", max(min(height, 40), 8))
+
+    for index in range(num_elements):
+
+        pos = [(index % columns) * width, (index // columns) * height]
+
+        if index % 10 == 9:
+
+            page.add_element(Text("T" + str(index), font, pos = pos))
+
+        else:
+
+            page.add_element(ButtonText("B" + str(index), font, pos = pos))
+
+    return page
+
+def make_manager (screen, page):
+    """
+    Make a menu manager showing a single page.
+
+    Positional Arguments:
+        screen (pygame.Surface): Display surface.
+        page (Page): Start page.
+
+    Returns:
+        MenuManager: The menu manager.
+    """
+
+    manager = MenuManager(screen, pygame.time.Clock())
+    manager.add_page(page)
+    manager.set_start_page(page.get_id())
+
+    return manager
+
+def bench_build_page (repeat):
+    """
+    Time building pages of increasing size, with empty and with filled text
+    caches.
+
+    Positional Arguments:
+        repeat (int): Number of runs per benchmark.
+
+    Returns:
+        dict: Results per page size.
+    """
+
+    results = dict()
+
+    for num_elements in PAGE_SIZES:
+
+        def build_cold ():
+
+            clear_caches()
+            build_page(num_elements)
+
+        results[num_elements] = {
+            "cold": time_runs(build_cold, repeat),
+            "warm": time_runs(lambda: build_page(num_elements), repeat)
+        }
+
+    return results
+
+def bench_display (screen, repeat):
+    """
+    Time drawing pages of increasing size: a full redraw, a baked page, and a
+    dirty rendering frame after one element changed.
+
+    Positional Arguments:
+        screen (pygame.Surface): Display surface.
+        repeat (int): Number of runs per benchmark.
+
+    Returns:
+        dict: Results per page size.
+    """
+
+    results = dict()
+    background_color = menus_dev.DEFAULT_MENU_BACKGROUND_COLOR
+
+    for num_elements in PAGE_SIZES:
+
+        page = build_page(num_elements)
+        baked_page = build_page(num_elements, baked = True)
+        page.convert_images()
+        baked_page.convert_images()
+
+        # First draw of the baked page fills its cache
+        baked_page.display(screen, background_color)
+
+        page.display_dirty(screen, background_color)
+        element = page.get_elements()[0]
+
+        def dirty_frame ():
+
+            element.set_pos([element.rect.x ^ 1, element.rect.y])
+            page.display_dirty(screen, background_color)
+
+        results[num_elements] = {
+            "full": time_runs(lambda: page.display(screen, background_color),
+                              repeat),
+            "baked": time_runs(
+                lambda: baked_page.display(screen, background_color), repeat),
+            "dirty_one_element": time_runs(dirty_frame, repeat)
+        }
+
+    return results
+
+def bench_hit_testing (screen, repeat):
+    """
+    Time handling a stream of CLICKS left clicks at random positions on pages
+    of increasing size. Every button is given an action that does nothing.
+
+    Positional Arguments:
+        screen (pygame.Surface): Display surface.
+        repeat (int): Number of runs per benchmark.
+
+    Returns:
+        dict: Results per page size, timing the whole click stream.
+    """
+
+    results = dict()
+    randomizer = random.Random(0)
+
+    for num_elements in PAGE_SIZES:
+
+        page = build_page(num_elements)
+
+        for element in page.get_elements():
+
+            if isinstance(element, ButtonText):
+
+                element.add_action(lambda: None)
+
+        manager = make_manager(screen, page)
+
+        clicks = [pygame.event.Event(pygame.MOUSEBUTTONDOWN, button = 1,
+                                     pos = (randomizer.randrange(SCREEN_WIDTH),
+                                            randomizer.randrange(SCREEN_HEIGHT)))
+                  for click in range(CLICKS)]
+
+        results[num_elements] = time_runs(
+            lambda: manager.handle_events(clicks), repeat)
+
+    return results
+
+def bench_set_text (repeat):
+    """
+    Time changing the text of a button SET_TEXT_CALLS times, cycling through
+    a small set of strings, like a counter, and through new strings only.
+
+    Positional Arguments:
+        repeat (int): Number of runs per benchmark.
+
+    Returns:
+        dict: Results for repeated and for unique strings.
+    """
+
+    page = build_page(100)
+    button = page.get_elements()[0]
+
+    def repeated_strings ():
+
+        for index in range(SET_TEXT_CALLS):
+
+            button.set_text(str(index % 10))
+
+    def unique_strings ():
+
+        start = random.random()
+
+        for index in range(SET_TEXT_CALLS):
+
+            button.set_text(str(start + index))
+
+    return {"repeated": time_runs(repeated_strings, repeat),
+            "unique": time_runs(unique_strings, repeat)}
+
+def bench_save_highscore (screen, repeat):
+    """
+    Time saving HIGHSCORE_SAVES highscores through a menu manager with a
+    highscore page, into highscore files of increasing size. Both the time
+    spent in save_highscore and the time until every score is on the disk
+    are reported.
+
+    Positional Arguments:
+        screen (pygame.Surface): Display surface.
+        repeat (int): Number of runs per benchmark.
+
+    Returns:
+        dict: Results per number of lines in the highscore file.
+    """
+
+    results = dict()
+    randomizer = random.Random(0)
+
+    for num_lines in HIGHSCORE_FILE_SIZES:
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            filename = os.path.join(directory, "highscores.txt")
+
+            with open(filename, 'w') as f:
+
+                for line in range(num_lines):
+
+                    f.write(f"user{line} {randomizer.randrange(100000)}\n")
+
+            home = Page("home")
+            highscore_button = ButtonText("Highscores", menus_dev.DEFAULT_FONT)
+            home.add_element(highscore_button)
+
+            manager = make_manager(screen, home)
+
+            start = time.perf_counter()
+            manager.add_highscore_page(highscore_button, "home",
+                                       menus_dev.DEFAULT_FONT,
+                                       highscore_file = filename)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            def save ():
+
+                for score in range(HIGHSCORE_SAVES):
+
+                    manager.save_highscore("bench",
+                                           randomizer.randrange(100000))
+
+            def save_and_flush ():
+
+                save()
+                manager.flush_highscores()
+
+            results[num_lines] = {
+                "load_ms": load_ms,
+                "save": time_runs(save, repeat),
+                "save_and_flush": time_runs(save_and_flush, repeat)
+            }
+
+            manager.flush_highscores()
+
+    return results
+
+def main ():
+    """
+    Run every benchmark and print or write the results as JSON.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark the menu system "
+                                     "without a window.")
+    parser.add_argument("--repeat", type = int, default = DEFAULT_REPEAT,
+                        help = "runs per benchmark")
+    parser.add_argument("--output", help = "write the results to this file "
+                        "instead of printing them")
+    arguments = parser.parse_args()
+
+    screen = pygame.display.set_mode([SCREEN_WIDTH, SCREEN_HEIGHT])
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(str(part) for part in pygame.get_sdl_version()),
+            "platform": platform.platform(),
+            "video_driver": pygame.display.get_driver()
+        },
+        "build_page": bench_build_page(arguments.repeat),
+        "display": bench_display(screen, arguments.repeat),
+        "hit_testing": bench_hit_testing(screen, arguments.repeat),
+        "set_text": bench_set_text(arguments.repeat),
+        "save_highscore": bench_save_highscore(screen, arguments.repeat)
+    }
+
+    output = json.dumps(results, indent = 2)
+
+    if arguments.output == None:
+
+        print(output)
+
+    else:
+
+        with open(arguments.output, 'w') as f:
+
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+
+    main()
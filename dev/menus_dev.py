@@ -7,7 +7,32 @@ Last Edit: 1 January 2021
 # Imports
 import pygame
 import string
+import os
 import os.path
+import bisect
+import asyncio
+import inspect
+import sqlite3
+import threading
+import math
+import time
+import gzip
+import json
+import hashlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+# File locking for the highscore file is only available on Unix
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# TOML menu files need Python 3.11 or newer
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
 
 # Initialize pygame
 pygame.init()
@@ -16,943 +41,5595 @@ pygame.init()
 BLACK    = [0, 0, 0]
 WHITE    = [255, 255, 255]
 MENU_FPS = 60
-DEFAULT_FONT = pygame.font.SysFont("Arial", 40)
+DEFAULT_FONT = ("Arial", 40)
 DEFAULT_TEXT_COLOR = WHITE
 DEFAULT_COLORKEY = BLACK
 DEFAULT_MENU_BACKGROUND_COLOR = BLACK
 HIGHSCORE_FILE = "highscores.txt"
+MAX_DIRTY_RECTS = 32
+IMAGE_CACHE_BUDGET = 64 * 1024 * 1024
+IDLE_TIMEOUT = 500
+TEXT_CACHE_SIZE = 512
+GRID_CELL_SIZE = 64
+HISTORY_SIZE = 32
+HIGHSCORE_COMPACT_RATIO = 4
+HIGHSCORE_RETRY_INTERVAL = 1000
+HIGHSCORE_LOG_MARKER = "--"
+BACKGROUND_WORKERS = 4
+SPINNER_COLOR = WHITE
+SPINNER_SPEED = 2
+STATS_FRAMES = 120
+STATS_PHASES = ("events", "draw", "present", "wait")
+STATS_FONT = ("Arial", 16)
+INPUT_RECORDING_VERSION = 1
+MENU_CACHE_VERSION = 2
+MENU_CACHE_SUFFIX = ".cache"
+MENU_ELEMENT_TYPES = ("button_text", "button_picture", "text", "picture")
+HOT_RELOAD_INTERVAL = 500
+
+# Settings from the first published version of the module. MenuManager reads
+# the background color when it is made and the frame rate every frame.
+# element_colorkey is only kept so code that sets it still runs, picture
+# elements take a colorkey argument instead
+menu_manager_settings = {
+
+    "element_colorkey" : DEFAULT_COLORKEY,
+    "menu_background_color" : DEFAULT_MENU_BACKGROUND_COLOR,
+    "menu_fps" : MENU_FPS
+
+}
+
+# Posted when a background button action finishes
+BACKGROUND_ACTION_DONE = pygame.event.custom_type()
+
+# Events after which the window contents have to be drawn again
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.VIDEORESIZE, pygame.ACTIVEEVENT,
+                 pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED,
+                 pygame.WINDOWSIZECHANGED)
+
+def display_format ():
+    """
+    Get a description of the pixel format of the display.
 
-class Action:
+    Returns:
+        tuple: Bit size and color masks of the display surface, or None if no
+               display has been created yet.
     """
-    Holds function and argument data for buttons.
 
-    Attributes:
-        function: The function to execute.
-        arguments: Arguments for the function.
-        keyword_arguments: Keyword arguments for the function.
+    display = pygame.display.get_surface()
+
+    if display == None:
+
+        return None
+
+    return (display.get_bitsize(), display.get_masks())
+
+def prepare_surface (surface, colorkey = DEFAULT_COLORKEY):
     """
+    Convert a surface to the pixel format of the display so blitting it does
+    not need a conversion every frame. Surfaces that are see-through in places
+    keep per-pixel alpha, all others are converted to the display format with
+    an RLE accelerated colorkey. If no display exists yet the surface is
+    returned as is, and MenuManager converts it once the display is created.
 
-    def __init__ (self, function, args, kwargs):
-        """
-        Instantiate an Action object.
+    Positional Arguments:
+        surface (pygame.Surface): Surface to convert.
 
-        Positional Arguments:
-            function: The function to execute.
-            args: Arguments for the function.
-            kwargs: Keyword arguments for the function.
-        """
+    Keyword Arguments:
+        colorkey (list): Colorkey for the surface. Default is black.
 
-        self.function = function
-        self.arguments = args
-        self.keyword_arguments = kwargs
+    Returns:
+        pygame.Surface: The converted surface.
+    """
 
-    def execute (self):
-        """
-        Calls the function, passing in the arguments and keyword arguments from
-        this Action object.
-        """
+    if display_format() == None:
+
+        surface.set_colorkey(colorkey)
+        return surface
+
+    uses_alpha = False
+
+    if surface.get_flags() & pygame.SRCALPHA:
+
+        # Only keep per-pixel alpha if some pixel is not fully opaque. Masks
+        # use the colorkey instead of alpha when one is set.
+        old_colorkey = surface.get_colorkey()
+        surface.set_colorkey(None)
+        width, height = surface.get_size()
+        opaque_pixels = pygame.mask.from_surface(surface, 254).count()
+        uses_alpha = opaque_pixels < width * height
+        surface.set_colorkey(old_colorkey)
+
+    if uses_alpha:
+
+        surface = surface.convert_alpha()
+
+    else:
+
+        surface = surface.convert()
 
-        self.function(*self.arguments, **self.keyword_arguments)
+    surface.set_colorkey(colorkey, pygame.RLEACCEL)
 
-class ButtonPicture(pygame.sprite.Sprite):
+    return surface
+
+def draw_spinner (surface, rect):
     """
-    Button that uses a picture as its image. When clicked, the Actions attatched
-    to the button will be executed.
+    Draw a turning arc in the middle of an area, to show that a button is
+    busy. The angle of the arc comes from the time since pygame started, so
+    it turns as long as the area is redrawn every frame.
 
-    Attributes:
-        image (pygame.image): Image for button.
-        rect (pygame.image.rect): Position, height, width values for image.
-        actions (list): List of Action objects to be executed when the button is
-                        clicked.
+    Positional Arguments:
+        surface (pygame.Surface): Surface to draw on.
+        rect (pygame.Rect): Area to draw the spinner in.
     """
 
-    def __init__ (self, filename, pos = [0,0], colorkey = DEFAULT_COLORKEY):
-        """
-        Instantiate a ButtonPicture object.
+    size = min(rect.width, rect.height) - 4
 
-        Positional Arguments:
-            filename (string): Path of image file to be used for button.
+    if size < 4:
 
-        Keyword Arguments:
-            pos (list): XY position for the button. Default is [0,0].
-            colorkey (list): Colorkey for the image used. Default is black.
-        """
+        return
 
-        super(ButtonPicture, self).__init__()
+    spinner_rect = pygame.Rect(0, 0, size, size)
+    spinner_rect.center = rect.center
 
-        self.image = pygame.image.load(filename)
-        self.image.set_colorkey(colorkey)
-        self.rect = self.image.get_rect()
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
-        self.actions = []
+    start = pygame.time.get_ticks() / 1000 * SPINNER_SPEED * 2 * math.pi
 
-    def get_dimensions (self):
-        """
-        Get the width and height of the ButtonPicture.
+    pygame.draw.arc(surface, SPINNER_COLOR, spinner_rect, -start,
+                    -start + 1.5 * math.pi, max(size // 8, 1))
 
-        Returns:
-            list: Width and Height of the ButtonPicture. Uses width and height
-                  from self.rect.
-                  Format: [width, height]
-        """
+class ImageCache:
+    """
+    Shared store for images loaded from disk. Every image file is loaded once
+    per colorkey, no matter how many elements use it. The cache counts how many
+    elements are using each image, and images that are no longer used are kept
+    around until the cache grows past its byte budget, at which point the least
+    recently used ones are dropped.
 
-        dimensions = [self.rect.width, self.rect.height]
-        return dimensions
+    Attributes:
+        budget (int): Number of bytes of image data the cache tries to stay
+                      under. Images still in use are never dropped, so the
+                      cache can go over budget if they alone exceed it.
+        size (int): Number of bytes of image data currently in the cache.
+        entries (OrderedDict): Cached images, least recently used first.
+                               Maps (path, colorkey) to a list of
+                               [surface, reference count, size in bytes,
+                               display format of the surface].
+    """
 
-    def get_pos (self):
+    def __init__ (self, budget = IMAGE_CACHE_BUDGET):
         """
-        Get the position of this picture button element.
+        Instantiate an ImageCache object.
 
-        Returns:
-            list: XY position of the picture button.
-                  Format: [x, y]
+        Keyword Arguments:
+            budget (int): Byte budget for the cache. Default is 64 MB.
         """
 
-        position = [self.rect.x, self.rect.y]
-        return position
+        self.budget = budget
+        self.size = 0
+        self.entries = OrderedDict()
 
-    def set_pos (self, pos):
+    def acquire (self, filename, colorkey = DEFAULT_COLORKEY):
         """
-        Set position of the button.
+        Get the image for a file, loading it if it is not cached yet. Every call
+        should be matched by a call to release once the image is not used
+        anymore.
 
         Positional Arguments:
-            list: XY position to set the button to.
-                  Format: [x, y]
-        """
+            filename (string): Path of the image file.
 
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        Keyword Arguments:
+            colorkey (list): Colorkey for the image. Default is black.
 
-    def add_action (self, function, *args, **kwargs):
+        Returns:
+            pygame.Surface: The shared image. Do not draw on it.
         """
-        Adds an action to the list of actions for this button.
 
-        Positional Arguments:
-            function (function reference): The function to execute.
-            *args: Arguments for the function.
-            **kwargs: Keyword arguments for the function.
-        """
+        key = self.__key(filename, colorkey)
+        entry = self.entries.get(key)
 
-        new_action = Action(function, args, kwargs)
-        self.actions.append(new_action)
+        if entry == None:
 
-    def execute_actions (self):
-        """
-        Execute function linked to this button.
-        """
+            image = prepare_surface(pygame.image.load(filename), colorkey)
 
-        for action in self.actions:
+            entry = [image, 0, image.get_pitch() * image.get_height(),
+                     display_format()]
+            self.entries[key] = entry
+            self.size += entry[2]
 
-            action.execute()
+        entry[1] += 1
+        self.entries.move_to_end(key)
 
-    def is_clicked (self, mouse_pos):
+        self.__trim()
+
+        return entry[0]
+
+    def release (self, filename, colorkey = DEFAULT_COLORKEY):
         """
-        Returns true if the mouse cursor position is on this sprite.
+        Tell the cache that an element stopped using an image.
 
         Positional Arguments:
-            mouse_pos (list): XY position of the cursor.
-        """
+            filename (string): Path of the image file.
 
-        # Check x axis
-        within_x = mouse_pos[0] >= self.rect.x and \
-                   mouse_pos[0] <= self.rect.x + self.rect.width
+        Keyword Arguments:
+            colorkey (list): Colorkey the image was acquired with. Default is
+                             black.
+        """
 
-        # Check y axis
-        within_y = mouse_pos[1] >= self.rect.y and \
-                   mouse_pos[1] <= self.rect.y + self.rect.height
+        entry = self.entries.get(self.__key(filename, colorkey))
 
-        # True if within x and y area
-        return within_x and within_y
+        if entry != None and entry[1] > 0:
 
-class ButtonText (pygame.sprite.Sprite):
-    """
-    Button that uses text as its image. When clicked, the Actions attatched to
-    the button will be executed.
+            entry[1] -= 1
 
-    Attributes:
-        text (string): Text to make the button from.
-        font (pygame.font.SysFont): Font to render the text in.
-        color (list): Color that the text should be. Should be supplied as a
-                      list of three integers between 0 and 255, inclusive.
-                      Default is [255, 255, 255], or white.
-        background_color (list): Color that the background of the text should
-                                 be. Should be supplied as a list of three
-                                 integers between 0 and 255, inclusive. Default
-                                 is [255, 255, 255], or white.
-        antialias (boolean): True if pygame should antialias the image for the
-                             button. True by default.
-        image (pygame.image): Image for button.
-        rect (pygame.image.rect): Position, height, width values for image.
-        actions (list): List of Action objects to be executed when the button is
-                        clicked.
-    """
+            self.__trim()
 
-    def __init__ (self, text, font = DEFAULT_FONT, pos = [0,0],
-                  color = DEFAULT_TEXT_COLOR, background_color = None,
-                  antialias = True):
+    def convert (self, filename, colorkey = DEFAULT_COLORKEY):
         """
-        Instantiate a ButtonText object.
+        Get a cached image converted to the current display format. Does not
+        change the reference count of the image.
 
         Positional Arguments:
-            text (string): Text to make the button from.
-            font (pygame.font.SysFont): Font to render the text in.
+            filename (string): Path of the image file.
 
         Keyword Arguments:
-            pos (list): XY position for the button.
-            color (list): Color that the text should be. Should be supplied as a
-                          list of three integers between 0 and 255, inclusive.
-                          Default is [255, 255, 255], or white.
-            background_color (list): Color that the background of the text
-                                     should be. Should be supplied as a list of
-                                     three integers between 0 and 255,
-                                     inclusive. Default is None, or no
-                                     background color.
-            antialias (boolean): True if pygame should antialias the image for
-                                 the button. True by default.
+            colorkey (list): Colorkey the image was acquired with. Default is
+                             black.
+
+        Returns:
+            pygame.Surface: The shared image, or None if it is not cached.
         """
 
-        super(ButtonText, self).__init__()
+        entry = self.entries.get(self.__key(filename, colorkey))
 
-        self.text = text
-        self.font = font
-        self.color = color
-        self.background_color = background_color
-        self.antialias = antialias
+        if entry == None:
 
-        self.image = font.render(str(text), antialias, color, background_color)
-        self.image.set_colorkey(BLACK)
-        self.rect = self.image.get_rect()
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+            return None
 
-        self.actions = []
+        if entry[3] != display_format():
 
-    def get_dimensions (self):
+            self.size -= entry[2]
+            entry[0] = prepare_surface(entry[0], colorkey)
+            entry[2] = entry[0].get_pitch() * entry[0].get_height()
+            entry[3] = display_format()
+            self.size += entry[2]
+
+        return entry[0]
+
+    def reload (self, filename):
         """
-        Get the width and height of the button.
+        Load an image file again after it changed on disk, for every colorkey
+        it is cached with. Reference counts are kept, but elements using the
+        image keep the old surface until they get it again with convert.
+
+        Positional Arguments:
+            filename (string): Path of the image file.
 
         Returns:
-            list: Width and Height of the button. Uses width and height from
-                  self.rect.
-                  Format: [width, height]
+            boolean: True if the file was in the cache.
         """
 
-        dimensions = [self.rect.width, self.rect.height]
-        return dimensions
+        path = os.path.abspath(filename)
+        reloaded = False
 
-    def get_pos (self):
-        """
-        Get the position of this text button element.
+        for key, entry in self.entries.items():
 
-        Returns:
-            pos (list): XY position of the text button.
-        """
+            if key[0] != path:
 
-        position = [self.rect.x, self.rect.y]
-        return position
+                continue
 
-    def get_text(self):
-        """
-        Get the text of the button.
+            image = prepare_surface(pygame.image.load(filename), key[1])
 
-        Returns:
-            self.text (string): Text of the button.
-        """
+            self.size -= entry[2]
+            entry[0] = image
+            entry[2] = image.get_pitch() * image.get_height()
+            entry[3] = display_format()
+            self.size += entry[2]
+            reloaded = True
 
-        return self.text
+        self.__trim()
 
-    def set_pos (self, pos):
+        return reloaded
+
+    def set_budget (self, budget):
         """
-        Set position of the text.
+        Change the byte budget of the cache, dropping unused images if the
+        cache is now over budget.
 
         Positional Arguments:
-            pos (list): XY position to set the text button to.
+            budget (int): New byte budget for the cache.
         """
 
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        self.budget = budget
+        self.__trim()
 
-    def set_text (self, new_text):
+    def clear (self):
         """
-        Changes the text of the button.
-
-        Positional Arguments:
-            new_text (String): New text of the button.
+        Drop every image that is not in use.
         """
 
-        self.text = new_text
-        self.image = self.font.render(str(new_text), self.antialias, self.color, self.background_color)
+        for key in list(self.entries):
 
-    def add_action (self, function, *args, **kwargs):
-        """
-        Adds an action to the list of actions for this button.
+            if self.entries[key][1] == 0:
 
-        Positional Arguments:
-            function: The function to execute.
-            *args: Arguments for the function.
-            **kwargs: Keyword arguments for the function.
+                self.size -= self.entries.pop(key)[2]
+
+    def __key (self, filename, colorkey):
+        """
+        Build the cache key for a file and colorkey.
         """
 
-        new_action = Action(function, args, kwargs)
-        self.actions.append(new_action)
+        if colorkey != None:
 
-    def execute_actions (self):
+            colorkey = tuple(colorkey)
+
+        return (os.path.abspath(filename), colorkey)
+
+    def __trim (self):
         """
-        Execute function linked to this button.
+        Drop least recently used images that are not in use until the cache is
+        within its budget.
         """
 
-        for action in self.actions:
+        if self.size <= self.budget:
 
-            action.execute()
+            return
 
-    def is_clicked (self, mouse_pos):
-        """
-        Returns true if the mouse cursor position is on this sprite.
+        for key in list(self.entries):
 
-        Positional Arguments:
-            mouse_pos (tuple): XY position of the cursor.
-        """
+            if self.size <= self.budget:
 
-        # Check x area
-        within_x = mouse_pos[0] >= self.rect.x and mouse_pos[0] <= self.rect.x + self.rect.width
+                return
 
-        # Check y area
-        within_y = mouse_pos[1] >= self.rect.y and mouse_pos[1] <= self.rect.y + self.rect.height
+            if self.entries[key][1] == 0:
 
-        # True if within x and y area
-        return within_x and within_y
+                self.size -= self.entries.pop(key)[2]
 
-class Picture (pygame.sprite.Sprite):
+# Image cache shared by every ButtonPicture and Picture
+image_cache = ImageCache()
+
+class FontRegistry:
     """
-    Picture object for menu manager.
+    Shared store for fonts. Fonts are described by a (name, size) or
+    (name, size, bold, italic) tuple, where name is either the path of a font
+    file or the name of a system font, and are only opened the first time an
+    element uses them. Every element asking for the same font gets the same
+    pygame.font.Font object. Looking up system font names scans the fonts
+    installed on the computer, so the result is remembered per name.
 
     Attributes:
-        image (pygame.image): Image for picture.
-        rect (pygame.image.rect): Position, height, width values for picture.
+        fonts (dict): Opened fonts. Maps (name, size, bold, italic) to a
+                      pygame.font.Font.
+        paths (dict): Font files found for names. Maps (name, bold, italic) to
+                      the path of the font file, or None if pygame's default
+                      font is used.
     """
 
-    def __init__ (self, filename, pos = [0,0], colorkey = DEFAULT_COLORKEY):
+    def __init__ (self):
+        """
+        Instantiate a FontRegistry object.
         """
-        Instantiate a Picture object.
+
+        self.fonts = dict()
+        self.paths = dict()
+
+    def get (self, name, size, bold = False, italic = False):
+        """
+        Get a font, opening it if it has not been used yet.
 
         Positional Arguments:
-            filename (string): Path of image file to be used for picture.
+            name (string): Path of a font file, or name of a system font. Can
+                           be a comma separated list of system font names, the
+                           first one found is used. None uses pygame's default
+                           font.
+            size (int): Size of the font.
 
         Keyword Arguments:
-            pos (tuple): XY position for the picture. Default is [0, 0].
-            colorkey (list): Colorkey for the picture file used. Default is
-                             black.
+            bold (boolean): True for a bold font. Default is False.
+            italic (boolean): True for an italic font. Default is False.
+
+        Returns:
+            pygame.font.Font: The shared font.
         """
 
-        super(Picture, self).__init__()
+        key = (name, size, bold, italic)
+        font = self.fonts.get(key)
 
-        self.image = pygame.image.load(filename)
-        self.image.set_colorkey(colorkey)
-        self.rect = self.image.get_rect()
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        if font == None:
 
-    def get_dimensions (self):
-        """
-        Get the width and height of the picture.
+            path = self.__find_path(name, bold, italic)
+            font = pygame.font.Font(path, size)
 
-        Returns:
-            list: Width and Height of the picture. Uses width and height from
-                  self.rect.
-                  Format: [width, height]
-        """
+            # Like SysFont, fake the style if there is no font file for it
+            if bold and not self.__has_style(name, path, bold = True):
 
-        dimensions = [self.rect.width, self.rect.height]
-        return dimensions
+                font.set_bold(True)
 
-    def get_pos (self):
-        """
-        Get the position of this picture element.
+            if italic and not self.__has_style(name, path, italic = True):
 
-        Returns:
-            pos (list): XY position of the picture.
-        """
+                font.set_italic(True)
 
-        position = [self.rect.x, self.rect.y]
-        return position
+            self.fonts[key] = font
 
-    def set_pos (self, pos):
+        return font
+
+    def resolve (self, font):
         """
-        Set position of the picture.
+        Turn the font argument given to an element into a font object.
 
-        Arguments:
-            pos (tuple): XY position to set the picture to.
+        Positional Arguments:
+            font (pygame.font.Font, tuple): A font object, which is returned as
+                                            is, or a font description tuple
+                                            such as DEFAULT_FONT.
+
+        Returns:
+            pygame.font.Font: The font to render with.
         """
 
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        if isinstance(font, (tuple, list)):
 
-    def set_picture (self, new_image, new_colorkey = DEFAULT_COLORKEY):
+            return self.get(*font)
+
+        return font
+
+    def reload (self, name):
         """
-        Set a new picture for this instance of Picture. Preserves x and y
-        position of the old picture.
+        Forget the fonts opened from a font file, so they are opened again
+        from the file the next time they are used. Elements keep the fonts
+        they already have.
 
         Positional Arguments:
-            new_image (string): File name of the new picture.
+            name (string): Path of the font file, as given to get.
 
-        Keyword Arguments:
-            new_colorkey (list): Colorkey for the picture file used. Should be
-                                 given as a list of three integers. Default is
-                                 black.
+        Returns:
+            boolean: True if a font had been opened from the file.
         """
 
-        # Store the current position
-        temp_old_pos = self.get_pos()
+        keys = [key for key in self.fonts if key[0] == name]
 
-        # Load the new image
-        self.image = pygame.image.load(new_image)
-        self.image.set_colorkey(new_colorkey)
-        self.rect = self.image.get_rect()
+        for key in keys:
 
-        # Set the x and y position using the old position
-        self.rect.x = temp_old_pos[0]
-        self.rect.y = temp_old_pos[1]
+            del self.fonts[key]
 
-class Text (pygame.sprite.Sprite):
-    """
-    Text object for MenuManager.
+        return len(keys) > 0
+
+    def clear (self):
+        """
+        Forget every opened font and font file lookup.
+        """
+
+        self.fonts = dict()
+        self.paths = dict()
+
+    def __find_path (self, name, bold, italic):
+        """
+        Find the font file for a font name, remembering the result.
+        """
+
+        key = (name, bold, italic)
+
+        if key not in self.paths:
+
+            if name == None or os.path.isfile(name):
+
+                self.paths[key] = name
+
+            else:
+
+                self.paths[key] = pygame.font.match_font(name, bold, italic)
+
+        return self.paths[key]
+
+    def __has_style (self, name, path, bold = False, italic = False):
+        """
+        Check if a system font has a separate font file for a style.
+        """
+
+        if name == None or os.path.isfile(name):
+
+            return False
+
+        return path != None and path != self.__find_path(name, False, False)
+
+# Font registry shared by every ButtonText, Text and MenuManager
+font_registry = FontRegistry()
+
+class TextRenderCache:
+    """
+    Shared store for rendered text. Rendering a string with a TrueType font is
+    the most expensive thing the menu system does, so every combination of
+    font, string, color, antialias and background color is only rendered once
+    and then reused by all Text and ButtonText elements. The least recently
+    used renders are dropped once the cache is full.
 
     Attributes:
-        text (String): Text to be rendered.
-        font (pygame.font): Font used to render the text.
-        pos (tuple): Position of the text.
-        color (List): Color of the text.
-        antialias (Boolean): Adds antialias to text.
-        background_color (List): Background color of the text.
-        image (pygame.image): Rendered text.
-        rect (pygame.image.rect): Position, height, width values for Text.
+        max_entries (int): Number of rendered strings the cache holds.
+        entries (OrderedDict): Rendered strings, least recently used first.
+                               Maps (font, text, antialias, color,
+                               background color) to a list of [surface,
+                               display format of the surface].
+        hits (int): Number of renders served from the cache.
+        misses (int): Number of renders that had to call font.render.
     """
 
-    def __init__ (self, text, font = DEFAULT_FONT, pos = [0,0],
-                  color = DEFAULT_TEXT_COLOR, antialias = True,
-                  background_color = None):
+    def __init__ (self, max_entries = TEXT_CACHE_SIZE):
+        """
+        Instantiate a TextRenderCache object.
+
+        Keyword Arguments:
+            max_entries (int): Number of rendered strings the cache holds.
+                               Default is 512.
         """
-        Instantiates a new Text object.
+
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render (self, font, text, antialias, color, background_color = None):
+        """
+        Get the rendered image for a string, rendering it if it is not cached.
+        Takes the same arguments as pygame.font.Font.render.
 
         Positional Arguments:
-            text (String): Text to be rendered.
-            font (pygame.font): Font used to render the text.
+            font (pygame.font.Font): Font to render the text in.
+            text (string): Text to render.
+            antialias (boolean): True to antialias the text.
+            color (list): Color of the text.
 
         Keyword Arguments:
-            pos (tuple): Position of the text.
-            color (List): Color of the text.
-            antialias (Boolean): Adds antialias to text.
-            background_color (List): Background color of the text.
+            background_color (list): Background color of the text. Default is
+                                     None, or no background color.
+
+        Returns:
+            pygame.Surface: The shared rendered text. Do not draw on it.
         """
 
-        super(Text, self).__init__()
+        if background_color != None:
 
-        self.text = text
-        self.font = font
-        self.pos = pos
-        self.color = color
-        self.antialias = antialias
+            background_color = tuple(background_color)
 
-        self.image = font.render(str(text), antialias, color, background_color)
-        self.image.set_colorkey(BLACK)
-        self.rect = self.image.get_rect()
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        key = (font, str(text), antialias, tuple(color), background_color)
+        entry = self.entries.get(key)
 
-    def get_dimensions (self):
+        if entry == None:
+
+            self.misses += 1
+
+            image = font.render(str(text), antialias, color, background_color)
+            entry = [prepare_surface(image, BLACK), display_format()]
+            self.entries[key] = entry
+
+            if len(self.entries) > self.max_entries:
+
+                self.entries.popitem(last = False)
+
+        else:
+
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+            # Rendered before the display existed, or for another mode
+            if entry[1] != display_format():
+
+                entry[0] = prepare_surface(entry[0], BLACK)
+                entry[1] = display_format()
+
+        return entry[0]
+
+    def set_max_entries (self, max_entries):
+        """
+        Change the number of rendered strings the cache holds, dropping the
+        least recently used ones if there are too many.
+
+        Positional Arguments:
+            max_entries (int): New size of the cache.
+        """
+
+        self.max_entries = max_entries
+
+        while len(self.entries) > self.max_entries:
+
+            self.entries.popitem(last = False)
+
+    def clear (self):
+        """
+        Drop every rendered string and reset the hit and miss counters.
+        """
+
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+# Text render cache shared by every ButtonText and Text
+text_cache = TextRenderCache()
+
+class FrameStats:
+    """
+    Records where the time of each frame of the menu loop goes, for the last
+    STATS_FRAMES frames. A frame is split into the phases in STATS_PHASES:
+    handling events and running button actions, drawing the page, showing it
+    with pygame.display.flip or update, and waiting for the next frame in
+    clock.tick, asyncio.sleep or an idle mode event wait.
+
+    Attributes:
+        frames (deque): The last frames, oldest first. Each frame is a dict
+                        with the time of the whole frame and of each phase in
+                        seconds, under "frame" and the phase names, and the
+                        number of blits and of elements on the page, under
+                        "blits" and "elements".
+        frame_start (float): time.perf_counter() at the start of the current
+                             frame, or None if no frame was started.
+        phase_times (dict): Time spent in each phase of the current frame so
+                            far, in seconds.
+    """
+
+    def __init__ (self, max_frames = STATS_FRAMES):
+        """
+        Instantiate a FrameStats object.
+
+        Keyword Arguments:
+            max_frames (int): Number of frames to keep. Default is 120.
+        """
+
+        self.frames = deque(maxlen = max_frames)
+        self.frame_start = None
+        self.phase_times = dict.fromkeys(STATS_PHASES, 0.0)
+
+    def start_frame (self):
+        """
+        Start timing a new frame. A frame that was started but not ended is
+        dropped.
+        """
+
+        self.frame_start = time.perf_counter()
+        self.phase_times = dict.fromkeys(STATS_PHASES, 0.0)
+
+    def add_time (self, phase, seconds):
         """
-        Get the width and height of the Text.
+        Add time spent in a phase of the current frame.
+
+        Positional Arguments:
+            phase (string): One of STATS_PHASES.
+            seconds (float): Time spent.
+        """
+
+        self.phase_times[phase] += seconds
+
+    def end_frame (self, blits, elements):
+        """
+        Finish the current frame and add it to the recorded frames.
+
+        Positional Arguments:
+            blits (int): Number of blits done to draw the frame.
+            elements (int): Number of elements on the page shown.
+        """
+
+        if self.frame_start == None:
+
+            return
+
+        frame = dict(self.phase_times)
+        frame["frame"] = time.perf_counter() - self.frame_start
+        frame["blits"] = blits
+        frame["elements"] = elements
+
+        self.frames.append(frame)
+        self.frame_start = None
+
+    def get_frames (self):
+        """
+        Get the recorded frames.
 
         Returns:
-            list: Width and Height of the Text. Uses width and height from
-                  self.rect.
-                  Format: [width, height]
+            list: Frames, oldest first. See the class attributes.
         """
 
-        dimensions = [self.rect.width, self.rect.height]
-        return dimensions
+        return list(self.frames)
 
-    def get_pos (self):
+    def summary (self):
         """
-        Get the position of this text element.
+        Sum up the recorded frames.
 
         Returns:
-            pos (list): XY position of the text.
+            dict: "frames" is the number of frames recorded and "fps" the
+                  frame rate over them. "frame" and each phase name map to a
+                  dict with the "average" and "max" time in milliseconds.
+                  "blits" is the average number of blits per frame and
+                  "elements" the number of elements in the last frame.
         """
 
-        position = [self.rect.x, self.rect.y]
-        return position
+        summary = {"frames": len(self.frames), "fps": 0.0, "blits": 0.0,
+                   "elements": 0}
 
-    def set_pos (self, pos):
+        for key in ("frame",) + STATS_PHASES:
+
+            times = [frame[key] for frame in self.frames]
+            summary[key] = {"average": 0.0, "max": 0.0}
+
+            if times:
+
+                summary[key]["average"] = sum(times) / len(times) * 1000
+                summary[key]["max"] = max(times) * 1000
+
+        if self.frames:
+
+            total_time = sum(frame["frame"] for frame in self.frames)
+
+            if total_time > 0:
+
+                summary["fps"] = len(self.frames) / total_time
+
+            summary["blits"] = sum(frame["blits"] for frame in self.frames) / \
+                len(self.frames)
+            summary["elements"] = self.frames[-1]["elements"]
+
+        return summary
+
+    def clear (self):
+        """
+        Forget all recorded frames.
         """
-        Set position of the text.
 
-        Arguments:
-            pos (list): XY position to set the text to.
+        self.frames.clear()
+        self.frame_start = None
+
+class InputRecorder:
+    """
+    Writes the events handled by a MenuManager to a file, one frame at a
+    time, so a session can be played back with MenuManager.replay_input.
+
+    The file is gzip compressed text. The first line describes the recording,
+    every other line is one event as a JSON list of the frame number, the
+    time since the recording started in milliseconds, the event type and the
+    event attributes. Frames without events take no space. Attributes that
+    can not be written as JSON, such as window objects, are left out, and
+    BACKGROUND_ACTION_DONE events are not recorded since they can not be
+    replayed.
+
+    Attributes:
+        filename (string): Path of the recording file.
+        file (gzip.GzipFile): The open recording file, or None once closed.
+        frame (int): Number of the next frame.
+        start_time (float): time.perf_counter() when the recording started.
+    """
+
+    def __init__ (self, filename):
         """
+        Instantiate an InputRecorder object and start the recording file.
 
-        self.rect.x = pos[0]
-        self.rect.y = pos[1]
+        Positional Arguments:
+            filename (string): Path of the recording file. Replaced if it
+                               exists.
+        """
 
-    def get_text (self):
+        self.filename = filename
+        self.file = gzip.open(filename, 'wt', encoding = "utf-8")
+        self.frame = 0
+        self.start_time = time.perf_counter()
+
+        header = {"version": INPUT_RECORDING_VERSION,
+                  "pygame": pygame.version.ver}
+        self.file.write(json.dumps(header) + "\n")
+
+    def record (self, events):
         """
-        Get the text as a String.
+        Add a frame of events to the recording.
+
+        Positional Arguments:
+            events (list): Pygame events of the frame.
+        """
+
+        if self.file == None:
+
+            return
+
+        time_ms = round((time.perf_counter() - self.start_time) * 1000, 1)
+
+        for event in events:
+
+            if event.type == BACKGROUND_ACTION_DONE:
+
+                continue
+
+            attributes = dict()
+
+            for name, value in event.dict.items():
+
+                if isinstance(value, (bool, int, float, str, tuple, list)) and \
+                   name != "window":
+
+                    attributes[name] = value
+
+            self.file.write(json.dumps([self.frame, time_ms, event.type,
+                                        attributes],
+                                       separators = (",", ":")) + "\n")
+
+        self.frame += 1
+
+    def close (self):
+        """
+        Finish the recording and close the file.
+        """
+
+        if self.file == None:
+
+            return
+
+        # The last frames may hold no events, but still have to be replayed
+        self.file.write(json.dumps([self.frame, None, None, None],
+                                   separators = (",", ":")) + "\n")
+        self.file.close()
+        self.file = None
+
+def read_complete_lines (f):
+    """
+    Read the lines of a recording file, stopping quietly where a recording
+    that was not closed, because the game crashed or was killed, breaks off.
+
+    Positional Arguments:
+        f (gzip.GzipFile): Recording file opened in text mode.
+
+    Returns:
+        list: Complete lines of the file.
+    """
+
+    lines = list()
+
+    try:
+
+        for line in f:
+
+            lines.append(line)
+
+    except EOFError:
+
+        pass
+
+    if lines and not lines[-1].endswith("\n"):
+
+        lines.pop()
+
+    return lines
+
+def load_input_recording (filename):
+    """
+    Read a recording made by InputRecorder. A recording that was not closed
+    is read up to where it breaks off.
+
+    Positional Arguments:
+        filename (string): Path of the recording file.
+
+    Returns:
+        list: One list of pygame events per recorded frame.
+    """
+
+    frames = list()
+
+    with gzip.open(filename, 'rt', encoding = "utf-8") as f:
+
+        header = json.loads(f.readline() or "null")
+
+        if not isinstance(header, dict) or \
+           header.get("version") != INPUT_RECORDING_VERSION:
+
+            print("Error in load_input_recording: Not a recording file, " +
+                  str(filename) + "!")
+            exit(-1)
+
+        for line in read_complete_lines(f):
+
+            frame, time_ms, event_type, attributes = json.loads(line)
+
+            while len(frames) < frame:
+
+                frames.append(list())
+
+            # End of the recording
+            if event_type == None:
+
+                break
+
+            if len(frames) == frame:
+
+                frames.append(list())
+
+            for name, value in attributes.items():
+
+                if isinstance(value, list):
+
+                    attributes[name] = tuple(value)
+
+            frames[frame].append(pygame.event.Event(event_type, attributes))
+
+    return frames
+
+class Action:
+    """
+    Holds function and argument data for buttons. Uses __slots__, since a
+    menu can hold one for every button.
+
+    Attributes:
+        function: The function to execute.
+        arguments: Arguments for the function.
+        keyword_arguments: Keyword arguments for the function.
+        background: True if the function runs on background_executor instead
+                    of the game's thread.
+        callback: Function called on the game's thread with the result of a
+                  background function, or None.
+    """
+
+    __slots__ = ("function", "arguments", "keyword_arguments", "background",
+                 "callback")
+
+    def __init__ (self, function, args, kwargs, background = False,
+                  callback = None):
+        """
+        Instantiate an Action object.
+
+        Positional Arguments:
+            function: The function to execute.
+            args: Arguments for the function.
+            kwargs: Keyword arguments for the function.
+
+        Keyword Arguments:
+            background (boolean): Run the function on background_executor.
+                                  Default is False.
+            callback (function reference): Called with the result of a
+                                           background function once it has
+                                           finished. Default is None.
+        """
+
+        self.function = function
+        self.arguments = args
+        self.keyword_arguments = kwargs
+        self.background = background
+        self.callback = callback
+
+    def execute (self, button = None):
+        """
+        Calls the function, passing in the arguments and keyword arguments from
+        this Action object. A background function is only started, and a
+        BACKGROUND_ACTION_DONE event is posted when it has finished.
+
+        Keyword Arguments:
+            button (ButtonPicture, ButtonText): Button the action belongs to,
+                                                passed on in the
+                                                BACKGROUND_ACTION_DONE event.
+                                                Default is None.
 
         Returns:
-            text (String): The text that makes the image.
+            object: What the function returned. For a coroutine function this
+                    is the coroutine, which the MenuManager schedules. For a
+                    background function this is its Future.
+        """
+
+        if not self.background:
+
+            return self.function(*self.arguments, **self.keyword_arguments)
+
+        future = background_executor.submit(self.function, *self.arguments,
+                                            **self.keyword_arguments)
+        future.add_done_callback(lambda future: pygame.event.post(
+            pygame.event.Event(BACKGROUND_ACTION_DONE, action = self,
+                               button = button, future = future)))
+
+        return future
+
+    def finish (self, future):
+        """
+        Finish a background function on the game's thread by passing its
+        result to the callback. Called by MenuManager when it gets the
+        BACKGROUND_ACTION_DONE event.
+
+        Positional Arguments:
+            future (concurrent.futures.Future): Future returned by execute.
+
+        Returns:
+            object: What the callback returned, or None if there is no
+                    callback.
+
+        NOTE: If the background function raised an exception, it is raised
+              again here.
+        """
+
+        result = future.result()
+
+        if self.callback == None:
+
+            return None
+
+        return self.callback(result)
+
+# Shared by the background actions of every button
+background_executor = ThreadPoolExecutor(max_workers = BACKGROUND_WORKERS,
+                                         thread_name_prefix = "menu_action")
+
+class Element (pygame.sprite.Sprite):
+    """
+    Base class of the elements that can be added to a Page. Holds the image
+    and position of the element, and the pages it is on.
+
+    Elements declare their attributes in __slots__ only so they are faster to
+    look up in the drawing loop. This does not save memory.
+
+    NOTE: pygame.sprite.Sprite has no __slots__, so every element still has a
+          __dict__ for the attributes Sprite keeps. Elements work with sprite
+          groups like any other sprite.
+
+    Attributes:
+        image (pygame.Surface): Image of the element.
+        rect (pygame.Rect): Position, height, width values for the image.
+        pages (list): Pages this element has been added to.
+    """
+
+    __slots__ = ("image", "rect", "pages")
+
+    def __init__ (self, image, pos):
+        """
+        Instantiate an Element object.
+
+        Positional Arguments:
+            image (pygame.Surface): Image of the element.
+            pos (list): XY position for the element.
+        """
+
+        super(Element, self).__init__()
+
+        self.image = image
+        self.rect = image.get_rect()
+        self.rect.x = pos[0]
+        self.rect.y = pos[1]
+        self.pages = []
+
+    def get_dimensions (self):
+        """
+        Get the width and height of the element.
+
+        Returns:
+            list: Width and Height of the element. Uses width and height from
+                  self.rect.
+                  Format: [width, height]
+        """
+
+        dimensions = [self.rect.width, self.rect.height]
+        return dimensions
+
+    def get_pos (self):
+        """
+        Get the position of this element.
+
+        Returns:
+            list: XY position of the element.
+                  Format: [x, y]
+        """
+
+        position = [self.rect.x, self.rect.y]
+        return position
+
+    def set_pos (self, pos):
+        """
+        Set position of the element.
+
+        Positional Arguments:
+            pos (list): XY position to set the element to.
+                        Format: [x, y]
+        """
+
+        old_rect = self.rect.copy()
+
+        self.rect.x = pos[0]
+        self.rect.y = pos[1]
+
+        self.mark_dirty(old_rect)
+
+    def mark_dirty (self, old_rect = None):
+        """
+        Tell the pages holding this element that it needs to be redrawn.
+
+        Keyword Arguments:
+            old_rect (pygame.Rect): Area the element covered before it changed.
+                                    Default is None, which only redraws the
+                                    current area of the element.
+        """
+
+        for page in self.pages:
+
+            page.mark_dirty(self, old_rect)
+
+    def replace_image (self, new_image):
+        """
+        Give the element a new image. Maintains the x and y position of the
+        old image.
+
+        Positional Arguments:
+            new_image (pygame.Surface): The new image.
+        """
+
+        # Store the current position
+        old_rect = self.rect.copy()
+
+        self.image = new_image
+        self.rect = new_image.get_rect()
+
+        # Set the x and y position using the old position
+        self.rect.x = old_rect.x
+        self.rect.y = old_rect.y
+
+        self.mark_dirty(old_rect)
+
+class ButtonMixin:
+    """
+    Clicking behaviour shared by ButtonPicture and ButtonText. When a button
+    is clicked, the Actions attatched to it are executed. Page and MenuManager
+    tell buttons from other elements by this class.
+
+    Classes using this mixin have to be Elements and have to set actions to
+    an empty list and busy to 0 in __init__. It has no slots of its own, so
+    it can be mixed with any Element.
+
+    Attributes:
+        actions (list): List of Action objects to be executed when the button is
+                        clicked.
+        busy (int): Number of background actions of this button that have not
+                    finished yet. A spinner is drawn over a busy button and
+                    clicks on it are ignored.
+    """
+
+    __slots__ = ()
+
+    def add_action (self, function, *args, **kwargs):
+        """
+        Adds an action to the list of actions for this button.
+
+        Positional Arguments:
+            function (function reference): The function to execute.
+            *args: Arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        NOTE: The function can be a coroutine function (async def). When the
+              menu is run with run_async, the coroutine is scheduled on the
+              event loop instead of being waited for, so the menu keeps
+              running. Otherwise it is run to the end with asyncio.run.
+        """
+
+        new_action = Action(function, args, kwargs)
+        self.actions.append(new_action)
+
+    def add_background_action (self, function, callback, *args, **kwargs):
+        """
+        Adds an action that runs on a background thread, for work that would
+        freeze the menu, like loading a level or scanning save files. The
+        button is busy until the function has finished, then callback is
+        called with its result on the game's thread.
+
+        Positional Arguments:
+            function (function reference): The function to execute.
+            callback (function reference): Called with the result of the
+                                           function, or None for no callback.
+            *args: Arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        NOTE: The function must not draw or change menu elements, since that
+              is not safe to do from another thread. Do that in the callback.
+              The callback is only called while the MenuManager handles
+              events, see BACKGROUND_ACTION_DONE.
+        """
+
+        new_action = Action(function, args, kwargs, background = True,
+                            callback = callback)
+        self.actions.append(new_action)
+
+    def execute_actions (self):
+        """
+        Execute function linked to this button.
+
+        Returns:
+            list: What each action returned, in order.
+        """
+
+        results = list()
+
+        for action in self.actions:
+
+            if action.background:
+
+                self.busy += 1
+                self.mark_dirty()
+
+            results.append(action.execute(self))
+
+        return results
+
+    def finish_background_action (self, action, future):
+        """
+        Finish a background action of this button. Called by MenuManager when
+        it gets the BACKGROUND_ACTION_DONE event.
+
+        Positional Arguments:
+            action (Action): The background action.
+            future (concurrent.futures.Future): Future of the action.
+
+        Returns:
+            object: What the callback of the action returned.
+        """
+
+        self.busy -= 1
+        self.mark_dirty()
+
+        return action.finish(future)
+
+    def is_busy (self):
+        """
+        Returns true if a background action of this button is still running.
+
+        Returns:
+            boolean: True if the button is busy.
+        """
+
+        return self.busy > 0
+
+    def is_clicked (self, mouse_pos):
+        """
+        Returns true if the mouse cursor position is on this button.
+
+        Positional Arguments:
+            mouse_pos (list): XY position of the cursor.
+        """
+
+        # Check x area
+        within_x = mouse_pos[0] >= self.rect.x and mouse_pos[0] <= self.rect.x + self.rect.width
+
+        # Check y area
+        within_y = mouse_pos[1] >= self.rect.y and mouse_pos[1] <= self.rect.y + self.rect.height
+
+        # True if within x and y area
+        return within_x and within_y
+
+class ButtonPicture (ButtonMixin, Element):
+    """
+    Button that uses a picture as its image. When clicked, the Actions attatched
+    to the button will be executed.
+
+    Attributes:
+        filename (string): Path of the image file used for the button.
+        colorkey (list): Colorkey of the image.
+        image (pygame.image): Image for button. Shared with other elements
+                              through the image cache.
+        rect (pygame.image.rect): Position, height, width values for image.
+        actions (list): List of Action objects to be executed when the button is
+                        clicked.
+        pages (list): Pages this button has been added to.
+        busy (int): Number of background actions of this button that have not
+                    finished yet.
+    """
+
+    __slots__ = ("filename", "colorkey", "actions", "busy")
+
+    def __init__ (self, filename, pos = [0,0], colorkey = DEFAULT_COLORKEY):
+        """
+        Instantiate a ButtonPicture object.
+
+        Positional Arguments:
+            filename (string): Path of image file to be used for button.
+
+        Keyword Arguments:
+            pos (list): XY position for the button. Default is [0,0].
+            colorkey (list): Colorkey for the image used. Default is black.
+        """
+
+        super(ButtonPicture, self).__init__(
+            image_cache.acquire(filename, colorkey), pos)
+
+        self.filename = filename
+        self.colorkey = colorkey
+        self.actions = []
+        self.busy = 0
+
+    def convert_image (self):
+        """
+        Convert the image of the button to the current display format. Called
+        by MenuManager when the display is created or its mode changes.
+        """
+
+        self.image = image_cache.convert(self.filename, self.colorkey)
+
+    def release_image (self):
+        """
+        Give this element's image back to the shared image cache. Call this
+        when the button will not be displayed anymore, so the cache can drop the
+        image once nothing else uses it.
+        """
+
+        image_cache.release(self.filename, self.colorkey)
+
+class ButtonText (ButtonMixin, Element):
+    """
+    Button that uses text as its image. When clicked, the Actions attatched to
+    the button will be executed.
+
+    Attributes:
+        text (string): Text to make the button from.
+        font (pygame.font.SysFont): Font to render the text in.
+        color (list): Color that the text should be. Should be supplied as a
+                      list of three integers between 0 and 255, inclusive.
+                      Default is [255, 255, 255], or white.
+        background_color (list): Color that the background of the text should
+                                 be. Should be supplied as a list of three
+                                 integers between 0 and 255, inclusive. Default
+                                 is [255, 255, 255], or white.
+        antialias (boolean): True if pygame should antialias the image for the
+                             button. True by default.
+        image (pygame.image): Image for button.
+        image_format (tuple): Display format the image was converted to, or
+                              None if it has not been converted yet.
+        rect (pygame.image.rect): Position, height, width values for image.
+        actions (list): List of Action objects to be executed when the button is
+                        clicked.
+        pages (list): Pages this button has been added to.
+        busy (int): Number of background actions of this button that have not
+                    finished yet.
+    """
+
+    __slots__ = ("text", "font", "color", "background_color", "antialias",
+                 "image_format", "actions", "busy")
+
+    def __init__ (self, text, font = DEFAULT_FONT, pos = [0,0],
+                  color = DEFAULT_TEXT_COLOR, antialias = True,
+                  background_color = None):
+        """
+        Instantiate a ButtonText object. The arguments are in the same order
+        as for Text.
+
+        Positional Arguments:
+            text (string): Text to make the button from.
+
+        Keyword Arguments:
+            font (pygame.font.Font, tuple): Font to render the text in. Either
+                                            a font object or a description
+                                            tuple for the font registry, such
+                                            as ("Arial", 40). Default is
+                                            DEFAULT_FONT.
+            pos (list): XY position for the button.
+            color (list): Color that the text should be. Should be supplied as a
+                          list of three integers between 0 and 255, inclusive.
+                          Default is [255, 255, 255], or white.
+            antialias (boolean): True if pygame should antialias the image for
+                                 the button. True by default.
+            background_color (list): Color that the background of the text
+                                     should be. Should be supplied as a list of
+                                     three integers between 0 and 255,
+                                     inclusive. Default is None, or no
+                                     background color.
+        """
+
+        self.text = text
+        self.font = font_registry.resolve(font)
+        self.color = color
+        self.background_color = background_color
+        self.antialias = antialias
+
+        super(ButtonText, self).__init__(
+            text_cache.render(self.font, text, antialias, color,
+                              background_color), pos)
+
+        self.image_format = display_format()
+        self.actions = []
+        self.busy = 0
+
+    def get_text(self):
+        """
+        Get the text of the button.
+
+        Returns:
+            self.text (string): Text of the button.
+        """
+
+        return self.text
+
+    def set_text (self, new_text):
+        """
+        Changes the text of the button.
+
+        Positional Arguments:
+            new_text (String): New text of the button.
+        """
+
+        self.text = new_text
+        self.image_format = display_format()
+        self.replace_image(text_cache.render(self.font, new_text,
+                                             self.antialias, self.color,
+                                             self.background_color))
+
+    def convert_image (self):
+        """
+        Convert the rendered text of the button to the current display format. Called by
+        MenuManager when the display is created or its mode changes.
+        """
+
+        if self.image_format != display_format():
+
+            self.image = text_cache.render(self.font, self.text, self.antialias,
+                                           self.color, self.background_color)
+            self.image_format = display_format()
+
+class Picture (Element):
+    """
+    Picture object for menu manager.
+
+    Attributes:
+        filename (string): Path of the image file used for the picture.
+        colorkey (list): Colorkey of the image.
+        image (pygame.image): Image for picture. Shared with other elements
+                              through the image cache.
+        rect (pygame.image.rect): Position, height, width values for picture.
+        pages (list): Pages this picture has been added to.
+    """
+
+    __slots__ = ("filename", "colorkey")
+
+    def __init__ (self, filename, pos = [0,0], colorkey = DEFAULT_COLORKEY):
+        """
+        Instantiate a Picture object.
+
+        Positional Arguments:
+            filename (string): Path of image file to be used for picture.
+
+        Keyword Arguments:
+            pos (tuple): XY position for the picture. Default is [0, 0].
+            colorkey (list): Colorkey for the picture file used. Default is
+                             black.
+        """
+
+        super(Picture, self).__init__(image_cache.acquire(filename, colorkey),
+                                      pos)
+
+        self.filename = filename
+        self.colorkey = colorkey
+
+    def convert_image (self):
+        """
+        Convert the image of the picture to the current display format. Called
+        by MenuManager when the display is created or its mode changes.
+        """
+
+        self.image = image_cache.convert(self.filename, self.colorkey)
+
+    def release_image (self):
+        """
+        Give this element's image back to the shared image cache. Call this
+        when the picture will not be displayed anymore, so the cache can drop the
+        image once nothing else uses it.
+        """
+
+        image_cache.release(self.filename, self.colorkey)
+
+    def set_picture (self, new_image, new_colorkey = DEFAULT_COLORKEY):
+        """
+        Set a new picture for this instance of Picture. Preserves x and y
+        position of the old picture.
+
+        Positional Arguments:
+            new_image (string): File name of the new picture.
+
+        Keyword Arguments:
+            new_colorkey (list): Colorkey for the picture file used. Should be
+                                 given as a list of three integers. Default is
+                                 black.
+        """
+
+        # Load the new image, giving the old one back to the cache
+        image = image_cache.acquire(new_image, new_colorkey)
+        image_cache.release(self.filename, self.colorkey)
+        self.filename = new_image
+        self.colorkey = new_colorkey
+
+        self.replace_image(image)
+
+    def set_image (self, new_image):
+        """
+        Set a new picture file, keeping the colorkey. Name of set_picture in
+        the first published version of the module.
+
+        Positional Arguments:
+            new_image (string): File name of the new picture.
+        """
+
+        self.set_picture(new_image, self.colorkey)
+
+class Text (Element):
+    """
+    Text object for MenuManager.
+
+    Attributes:
+        text (String): Text to be rendered.
+        font (pygame.font): Font used to render the text.
+        pos (tuple): Position of the text.
+        color (List): Color of the text.
+        antialias (Boolean): Adds antialias to text.
+        background_color (List): Background color of the text.
+        image (pygame.image): Rendered text.
+        image_format (tuple): Display format the image was converted to, or
+                              None if it has not been converted yet.
+        rect (pygame.image.rect): Position, height, width values for Text.
+        pages (list): Pages this text has been added to.
+    """
+
+    __slots__ = ("text", "font", "pos", "color", "antialias",
+                 "background_color", "image_format")
+
+    def __init__ (self, text, font = DEFAULT_FONT, pos = [0,0],
+                  color = DEFAULT_TEXT_COLOR, antialias = True,
+                  background_color = None):
+        """
+        Instantiates a new Text object.
+
+        Positional Arguments:
+            text (String): Text to be rendered.
+            font (pygame.font, tuple): Font used to render the text, or a font
+                                       registry description such as
+                                       ("Arial", 40).
+
+        Keyword Arguments:
+            pos (tuple): Position of the text.
+            color (List): Color of the text.
+            antialias (Boolean): Adds antialias to text.
+            background_color (List): Background color of the text.
+        """
+
+        self.text = text
+        self.font = font_registry.resolve(font)
+        self.pos = pos
+        self.color = color
+        self.antialias = antialias
+        self.background_color = background_color
+
+        super(Text, self).__init__(
+            text_cache.render(self.font, text, antialias, color,
+                              background_color), pos)
+
+        self.image_format = display_format()
+
+    def convert_image (self):
+        """
+        Convert the rendered text to the current display format. Called by
+        MenuManager when the display is created or its mode changes.
+        """
+
+        if self.image_format != display_format():
+
+            self.image = text_cache.render(self.font, self.text, self.antialias,
+                                           self.color, self.background_color)
+            self.image_format = display_format()
+
+    def get_text (self):
+        """
+        Get the text as a String.
+
+        Returns:
+            text (String): The text that makes the image.
+        """
+
+        return self.text
+
+    def set_text (self, new_text, new_font = DEFAULT_FONT,
+                  new_color = DEFAULT_TEXT_COLOR, new_antialias = True,
+                  new_background_color = None):
+        """
+        Set a new string as the text. Maintains the x and y position of the
+        original text.
+
+        Positional Arguments:
+            text (String): Text to be rendered.
+            font (pygame.font, tuple): Font used to render the text, or a font
+                                       registry description such as
+                                       ("Arial", 40).
+
+        Keyword Arguments:
+            pos (tuple): Position of the text.
+            color (List): Color of the text.
+            antialias (Boolean): Adds antialias to text.
+            background_color (List): Background color of the text.
+        """
+
+        self.text = new_text
+        self.font = font_registry.resolve(new_font)
+        self.color = new_color
+        self.antialias = new_antialias
+        self.background_color = new_background_color
+
+        # Re-render the text, setting image and rect
+        self.image_format = display_format()
+        self.replace_image(text_cache.render(self.font, new_text, new_antialias,
+                                             new_color, new_background_color))
+
+class HighscoreStore:
+    """
+    Keeps the best scores in memory, sorted, and saves new scores by appending
+    them to the end of the highscore file. The file holds "user score" lines.
+    It starts with the kept scores sorted best first, with equal scores newest
+    first, which is how older versions wrote the whole file. New scores are
+    appended after a HIGHSCORE_LOG_MARKER line, oldest first. A file without
+    the marker is read as sorted. Once the file holds HIGHSCORE_COMPACT_RATIO
+    times more lines than there are scores to keep, it is rewritten with only
+    the kept scores, sorted and without the marker.
+
+    All file writes happen on a background writer thread, so saving a score
+    never waits for the disk. Scores saved while the writer is busy are written
+    together in one batch. Rewrites go to a temporary file that is then moved
+    over the highscore file, and a line cut short by a crash is skipped when
+    the file is read and cut off before the next write, so a power cut can not
+    corrupt the scores already saved.
+
+    Several games can share one highscore file. Every append and rewrite is
+    done while holding an advisory lock (fcntl.flock) on a lock file next to
+    the highscore file, and right before writing, the lines other games
+    appended since this store last read the file are merged into the kept
+    scores. Only the new end of the file is read, unless another game
+    rewrote the file, in which case it is read again from the start. Every
+    rewrite counts up a number kept in the lock file once before and once
+    after replacing the file, which is how the other games notice it.
+    Inode numbers can not be used for this, as a rewritten file can get the
+    inode number of an older one. The number is odd while a rewrite is
+    going on, so refresh, which does not take the lock, skips reading then,
+    and only keeps what it read if the number did not change meanwhile. On
+    platforms without fcntl no lock is taken.
+
+    This is the default highscore backend of MenuManager. Any object with the
+    same add, get_scores, rank, count, refresh, version and flush methods can
+    be used instead, such as SQLiteLeaderboard.
+
+    Attributes:
+        filename (string): Path to the highscore file.
+        lock_filename (string): Path to the file locked while writing.
+        capacity (int): Number of scores to keep.
+        fsync_policy (string): When written data is forced onto the disk with
+                               os.fsync. "always" after every batch, "compact"
+                               only when the file is rewritten, "never" leaves
+                               it to the operating system.
+        scores (list): Kept scores, best first, as (-score, -number, user)
+                       tuples. Number counts up for every score added, so
+                       newer scores go before older equal scores.
+        next_number (int): Number given to the next score that is added.
+        log_lines (int): Number of score lines in the highscore file, counting
+                         lines still waiting to be written.
+        log_started (boolean): True if the highscore file has the marker line
+                               that appended scores go after.
+        pending (list): (user, score) pairs waiting to be appended by the
+                        writer thread.
+        compact_requested (boolean): True if compact was called and the writer
+                                     thread has not rewritten the file yet.
+        writing (boolean): True while the writer thread is using the file.
+        lock (threading.Condition): Guards everything above between the game
+                                    and the writer thread, and wakes the writer
+                                    thread up.
+        file_lock (threading.Lock): Held while the highscore file is read or
+                                    written, so the writer thread and refresh
+                                    do not read the same lines twice.
+        writer (threading.Thread): The writer thread, or None if it has not
+                                   been started.
+        write_error (OSError): Error of the last write, or None if it worked.
+                               Scores that could not be written stay in
+                               pending, and the writer thread tries again
+                               every HIGHSCORE_RETRY_INTERVAL milliseconds.
+        changes (int): Counts every change to the kept scores, so users of the
+                       store can tell if they need to fetch the scores again.
+        generation (int): Rewrite count of the highscore file, as read from
+                          the lock file when this store last read or wrote
+                          the highscore file, or None if it has not been read
+                          yet. Goes up by two for every rewrite.
+        file_offset (int): Number of bytes of the highscore file this store
+                           has read or written.
+    """
+
+    def __init__ (self, filename = HIGHSCORE_FILE, capacity = 5,
+                  fsync_policy = "always"):
+        """
+        Instantiate a HighscoreStore object and read in the highscore file.
+
+        Keyword Arguments:
+            filename (string): Path to the highscore file. Does not have to
+                               exist yet. Default is HIGHSCORE_FILE.
+            capacity (int): Number of scores to keep. Default is 5.
+            fsync_policy (string): "always", "compact" or "never". See the
+                                   class attributes. Default is "always".
+        """
+
+        if fsync_policy not in ("always", "compact", "never"):
+
+            print("Error in HighscoreStore: Invalid fsync policy!")
+            exit(-1)
+
+        self.filename = filename
+        self.lock_filename = filename + ".lock"
+        self.capacity = capacity
+        self.fsync_policy = fsync_policy
+        self.scores = list()
+        self.next_number = 0
+        self.log_lines = 0
+        self.log_started = False
+        self.pending = list()
+        self.compact_requested = False
+        self.writing = False
+        self.lock = threading.Condition()
+        self.file_lock = threading.Lock()
+        self.writer = None
+        self.write_error = None
+        self.changes = 0
+        self.generation = None
+        self.file_offset = 0
+
+        self.load()
+
+    def load (self):
+        """
+        Read the whole highscore file again, replacing the scores in memory.
+        Scores still waiting to be written are kept. Lines that are not a
+        "user score" pair are ignored, as is a last line without a line break,
+        which is what a write cut short by a crash leaves behind. Waits for
+        other games that are writing the file.
+        """
+
+        with self.file_lock:
+
+            try:
+
+                lock_file = self.__lock_file()
+
+            # The directory does not exist, so neither does the file
+            except OSError:
+
+                lock_file = None
+
+            try:
+
+                self.__merge_file(reload = True,
+                                  locked = fcntl != None and lock_file != None)
+
+            finally:
+
+                self.__unlock_file(lock_file)
+
+    def refresh (self):
+        """
+        Merge in the scores other games added to the highscore file since this
+        store last read or wrote it. Only checks the file's size and rewrite
+        count unless something changed, so this is cheap to call often.
+
+        Returns:
+            boolean: True if the file was read. False if nothing changed, or
+                     if this store or another game is writing the file.
+        """
+
+        # The writer thread is using the file and merges before it writes
+        if not self.file_lock.acquire(blocking = False):
+
+            return False
+
+        try:
+
+            with self.lock:
+
+                if self.writing:
+
+                    return False
+
+            if (self.__read_generation(), self.__get_file_size()) == \
+               (self.generation, self.file_offset):
+
+                return False
+
+            return self.__merge_file()
+
+        finally:
+
+            self.file_lock.release()
+
+    def version (self):
+        """
+        Get a value that changes whenever the kept scores change.
+
+        Returns:
+            int: Version of the kept scores.
+        """
+
+        return self.changes
+
+    def add (self, user, score):
+        """
+        Save a score. The score is put in place in memory right away, and
+        queued to be appended to the highscore file by the writer thread.
+
+        Positional Arguments:
+            user (string): Username of the player. Should not contain spaces.
+            score (int): Score the player got.
+
+        Returns:
+            int: Place of the score in the kept scores, starting at 0, or None
+                 if the score was not good enough to be kept.
+        """
+
+        with self.lock:
+
+            index = self.__insert(str(user), int(score))
+
+            self.pending.append((str(user), int(score)))
+            self.log_lines += 1
+
+            self.__wake_writer()
+
+        return index
+
+    def get_scores (self):
+        """
+        Get the kept scores.
+
+        Returns:
+            list: [user, score] pairs, best score first.
+        """
+
+        with self.lock:
+
+            return [[user, -score] for score, number, user in self.scores]
+
+    def rank (self, score):
+        """
+        Get the place a score would have among the kept scores.
+
+        Positional Arguments:
+            score (int): Score to look up.
+
+        Returns:
+            int: Place of the score, starting at 1, or None if the score is
+                 not good enough to be kept.
+        """
+
+        with self.lock:
+
+            place = bisect.bisect_left(self.scores, (-int(score),)) + 1
+
+        if place > self.capacity:
+
+            return None
+
+        return place
+
+    def count (self):
+        """
+        Get the number of scores ever saved to the highscore file. Only counts
+        scores still in the file, so this drops after a compaction.
+
+        Returns:
+            int: Number of scores.
+        """
+
+        return self.log_lines
+
+    def flush (self):
+        """
+        Wait until every saved score has been written to the highscore file.
+        Call this before the game exits. Does not wait if the file can not be
+        written.
+
+        Returns:
+            boolean: True if every score was written.
+        """
+
+        with self.lock:
+
+            while self.pending or self.compact_requested or self.writing:
+
+                if self.write_error != None or not self.writer.is_alive():
+
+                    return False
+
+                self.lock.wait(HIGHSCORE_RETRY_INTERVAL / 1000)
+
+            return True
+
+    def compact (self):
+        """
+        Rewrite the highscore file so it only holds the kept scores, and wait
+        for the rewrite to finish. The writer thread does this on its own when
+        the file grows too long.
+
+        Returns:
+            boolean: True if the file was rewritten.
+        """
+
+        with self.lock:
+
+            self.compact_requested = True
+            self.__wake_writer()
+
+        return self.flush()
+
+    def __insert (self, user, score):
+        """
+        Put a score in place among the kept scores. Must be called with the
+        lock held.
+
+        Positional Arguments:
+            user (string): Username of the player.
+            score (int): Score the player got.
+
+        Returns:
+            int: Place of the score, starting at 0, or None if the score was
+                 not good enough to be kept.
+        """
+
+        record = (-score, -self.next_number, user)
+        self.next_number += 1
+
+        index = bisect.bisect_left(self.scores, record)
+
+        if index >= self.capacity:
+
+            return None
+
+        self.scores.insert(index, record)
+        del self.scores[self.capacity:]
+        self.changes += 1
+
+        return index
+
+    def __merge_file (self, reload = False, writing = (), locked = False):
+        """
+        Read the lines added to the highscore file since this store last read
+        or wrote it, and put their scores in place among the kept scores. If
+        the file was rewritten or removed, it is read from the start instead
+        and the kept scores are rebuilt. Must be called with file_lock held.
+
+        Keyword Arguments:
+            reload (boolean): Read the file from the start even if it was not
+                              rewritten. Default is False.
+            writing (list): (user, score) pairs the writer thread is about to
+                            write, which are kept if the scores are rebuilt.
+                            Default is no pairs.
+            locked (boolean): True if the lock file is held with fcntl. A
+                              last line without a line break is then cut off
+                              the file, since no other game can be writing
+                              it. Default is False.
+
+        Returns:
+            boolean: True if the file was read. Without the lock, False if
+                     another game is rewriting the file.
+        """
+
+        while True:
+
+            generation = self.__read_generation()
+
+            # Another game is rewriting the file
+            if not locked and generation % 2 == 1:
+
+                return False
+
+            size = self.__get_file_size()
+
+            if reload or generation != self.generation or \
+               size < self.file_offset:
+
+                reload = True
+                offset = 0
+
+            else:
+
+                offset = self.file_offset
+
+            data = b""
+
+            if size > offset:
+
+                try:
+
+                    with open(self.filename, 'rb') as f:
+
+                        f.seek(offset)
+                        data = f.read()
+
+                except FileNotFoundError:
+
+                    pass
+
+            # Rewrites count up before and after replacing the file, so an
+            # unchanged even count means the data came from one file
+            if locked or self.__read_generation() == generation:
+
+                break
+
+        # Everything after the last line break is a line cut short, or a line
+        # another game is still writing
+        end = data.rfind(b"\n") + 1
+
+        if locked and end < len(data):
+
+            os.truncate(self.filename, offset + end)
+
+        lines = data[:end].splitlines()
+
+        with self.lock:
+
+            if reload:
+
+                self.scores = list()
+                self.log_lines = len(writing) + len(self.pending)
+                self.log_started = False
+                self.changes += 1
+
+            # The sorted part lists equal scores newest first, so it is put in
+            # place last line first
+            sorted_scores = list()
+
+            for line in lines:
+
+                text = line.decode("utf-8", "replace").strip()
+
+                if text == HIGHSCORE_LOG_MARKER:
+
+                    for user, score in reversed(sorted_scores):
+
+                        self.__insert(user, score)
+
+                    sorted_scores = list()
+                    self.log_started = True
+
+                    continue
+
+                self.log_lines += 1
+                user_score = text.split(" ")
+
+                if len(user_score) != 2 or \
+                   not user_score[1].lstrip("-").isdigit():
+
+                    continue
+
+                if self.log_started:
+
+                    self.__insert(user_score[0], int(user_score[1]))
+
+                else:
+
+                    sorted_scores.append((user_score[0], int(user_score[1])))
+
+            for user, score in reversed(sorted_scores):
+
+                self.__insert(user, score)
+
+            # Scores not in the file yet go after the ones read from it
+            if reload:
+
+                for user, score in list(writing) + self.pending:
+
+                    self.__insert(user, score)
+
+            self.generation = generation
+            self.file_offset = offset + end
+
+        return True
+
+    def __wake_writer (self):
+        """
+        Tell the writer thread there is work to do, starting it if needed.
+        Must be called with the lock held.
+        """
+
+        if self.writer == None or not self.writer.is_alive():
+
+            self.writer = threading.Thread(target = self.__write_loop,
+                                           daemon = True)
+            self.writer.start()
+
+        self.lock.notify_all()
+
+    def __write_loop (self):
+        """
+        Body of the writer thread. Takes every score waiting to be written,
+        locks the highscore file, merges in what other games wrote, and either
+        appends the scores in one write or rewrites the file when it has grown
+        too long. If the file can not be written, the scores are put back and
+        written again later.
+        """
+
+        while True:
+
+            with self.lock:
+
+                while not self.pending and not self.compact_requested:
+
+                    self.lock.wait()
+
+                # Give the disk some time before trying again after a failed
+                # write, even if more scores are added meanwhile
+                if self.write_error != None:
+
+                    retry_time = time.monotonic() + \
+                        HIGHSCORE_RETRY_INTERVAL / 1000
+
+                    while time.monotonic() < retry_time:
+
+                        self.lock.wait(retry_time - time.monotonic())
+
+                self.writing = True
+                batch = self.pending
+                compact = self.compact_requested
+                self.pending = list()
+                self.compact_requested = False
+
+            try:
+
+                with self.file_lock:
+
+                    lock_file = self.__lock_file()
+
+                    try:
+
+                        # Without fcntl nothing tells a rewrite in progress
+                        # from one that died, so an odd count is ended and the
+                        # file read again
+                        if not self.__merge_file(writing = batch,
+                                                 locked = fcntl != None):
+
+                            self.generation = self.__read_generation() + 1
+                            self.__write_generation(lock_file)
+                            self.__merge_file(reload = True, writing = batch)
+
+                        # A game died while rewriting the file, end its count
+                        if self.generation % 2 == 1:
+
+                            self.generation += 1
+                            self.__write_generation(lock_file)
+
+                        with self.lock:
+
+                            compact = compact or self.log_lines > \
+                                max(self.capacity, 1) * HIGHSCORE_COMPACT_RATIO
+
+                            if compact:
+
+                                # The kept scores include every new score worth
+                                # keeping, and are sorted best first with equal
+                                # scores newest first
+                                lines = [f"{user} {-score}\n" for score, number,
+                                         user in self.scores]
+                                self.log_lines = len(lines) + len(self.pending)
+
+                            else:
+
+                                lines = [f"{user} {score}\n"
+                                         for user, score in batch]
+
+                                if not self.log_started:
+
+                                    lines.insert(0, HIGHSCORE_LOG_MARKER + "\n")
+
+                        data = "".join(lines).encode("utf-8")
+
+                        if compact:
+
+                            self.generation += 1
+                            self.__write_generation(lock_file)
+                            self.__rewrite(data)
+                            self.generation += 1
+                            self.__write_generation(lock_file)
+                            self.file_offset = len(data)
+                            self.log_started = False
+
+                        else:
+
+                            size = self.__get_file_size()
+
+                            # Without fcntl a line cut short stays in the file,
+                            # so the new lines start on a line of their own
+                            if size > self.file_offset:
+
+                                data = b"\n" + data
+
+                            self.__append(data)
+                            self.file_offset = size + len(data)
+                            self.log_started = True
+
+                    finally:
+
+                        self.__unlock_file(lock_file)
+
+            except OSError as error:
+
+                with self.lock:
+
+                    # Put the scores back in front of the ones added since
+                    self.pending = batch + self.pending
+                    self.compact_requested = self.compact_requested or compact
+
+                    if self.write_error == None:
+
+                        print("Error in HighscoreStore: Can not write " +
+                              "highscore file, " + str(error) + "!")
+
+                    self.write_error = error
+
+            else:
+
+                with self.lock:
+
+                    self.write_error = None
+
+            finally:
+
+                with self.lock:
+
+                    self.writing = False
+                    self.lock.notify_all()
+
+    def __lock_file (self):
+        """
+        Open the lock file and take the advisory lock shared by every game
+        using the highscore file, waiting for other games to release it. The
+        lock is not taken if the platform has no fcntl.
+
+        Returns:
+            int: File descriptor of the lock file.
+        """
+
+        lock_file = os.open(self.lock_filename, os.O_RDWR | os.O_CREAT, 0o644)
+
+        if fcntl != None:
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        return lock_file
+
+    def __unlock_file (self, lock_file):
+        """
+        Release the lock taken by __lock_file.
+
+        Positional Arguments:
+            lock_file (int): File descriptor returned by __lock_file, or None
+                             if no lock was taken.
+        """
+
+        if lock_file == None:
+
+            return
+
+        if fcntl != None:
+
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        os.close(lock_file)
+
+    def __read_generation (self):
+        """
+        Read the number of rewrites of the highscore file from the lock file.
+
+        Returns:
+            int: Number of rewrites, or 0 if the lock file is missing or
+                 holds no number.
+        """
+
+        try:
+
+            with open(self.lock_filename, 'rb') as f:
+
+                return int(f.read() or b"0")
+
+        except (OSError, ValueError):
+
+            return 0
+
+    def __write_generation (self, lock_file):
+        """
+        Store this store's rewrite count in the lock file. The number always
+        takes the same number of bytes, so it overwrites the old one in one
+        write.
+
+        Positional Arguments:
+            lock_file (int): File descriptor returned by __lock_file.
+        """
+
+        os.lseek(lock_file, 0, os.SEEK_SET)
+        os.write(lock_file, f"{self.generation:020d}\n".encode("ascii"))
+
+    def __append (self, data):
+        """
+        Append data to the end of the highscore file.
+
+        Positional Arguments:
+            data (bytes): Lines to append.
+        """
+
+        with open(self.filename, 'ab') as f:
+
+            f.write(data)
+            f.flush()
+
+            if self.fsync_policy == "always":
+
+                os.fsync(f.fileno())
+
+    def __rewrite (self, data):
+        """
+        Replace the contents of the highscore file. The data is written to a
+        temporary file first, which is then moved over the highscore file.
+
+        Positional Arguments:
+            data (bytes): New contents of the file.
+        """
+
+        temp_filename = self.filename + ".tmp"
+
+        with open(temp_filename, 'wb') as f:
+
+            f.write(data)
+            f.flush()
+
+            if self.fsync_policy != "never":
+
+                os.fsync(f.fileno())
+
+        os.replace(temp_filename, self.filename)
+
+        if self.fsync_policy != "never":
+
+            self.__sync_directory()
+
+    def __sync_directory (self):
+        """
+        Force the rename of the highscore file onto the disk. Not every
+        platform supports this, so errors are ignored.
+        """
+
+        try:
+
+            directory = os.open(os.path.dirname(os.path.abspath(self.filename)),
+                                os.O_RDONLY)
+
+        except OSError:
+
+            return
+
+        try:
+
+            os.fsync(directory)
+
+        except OSError:
+
+            pass
+
+        finally:
+
+            os.close(directory)
+
+    def __get_file_size (self):
+        """
+        Get the size of the highscore file.
+
+        Returns:
+            int: Size in bytes, or 0 if the file does not exist.
+        """
+
+        try:
+
+            return os.stat(self.filename).st_size
+
+        except FileNotFoundError:
+
+            return 0
+
+class SQLiteLeaderboard:
+    """
+    Highscore backend that keeps every score ever saved in an SQLite database.
+    Scores are indexed by board and score, so the best scores and the rank of
+    any score are found without reading the whole history. One database file
+    can hold many boards, for example one per game mode or level.
+
+    Attributes:
+        filename (string): Path to the database file.
+        board (string): Name of the board this leaderboard reads and writes.
+        capacity (int): Number of scores returned by get_scores.
+        connection (sqlite3.Connection): Connection to the database.
+        lock (threading.Lock): Guards the connection, which can be shared
+                               between threads.
+        changes (int): Number of scores added through this leaderboard.
+    """
+
+    def __init__ (self, filename, board = "default", capacity = 5):
+        """
+        Instantiate an SQLiteLeaderboard object, creating the database file
+        and its tables if needed.
+
+        Positional Arguments:
+            filename (string): Path to the database file.
+
+        Keyword Arguments:
+            board (string): Name of the board. Default is "default".
+            capacity (int): Number of scores returned by get_scores. Default is
+                            5.
+        """
+
+        self.filename = filename
+        self.board = board
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.changes = 0
+        self.connection = sqlite3.connect(filename, check_same_thread = False)
+
+        with self.connection:
+
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "board TEXT NOT NULL, "
+                "user TEXT NOT NULL, "
+                "score INTEGER NOT NULL)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS scores_by_board_score "
+                "ON scores (board, score)")
+
+    def get_board (self, board):
+        """
+        Get a leaderboard for another board in the same database file.
+
+        Positional Arguments:
+            board (string): Name of the board.
+
+        Returns:
+            SQLiteLeaderboard: Leaderboard for the board.
+        """
+
+        return SQLiteLeaderboard(self.filename, board, self.capacity)
+
+    def add (self, user, score):
+        """
+        Save a score to the board.
+
+        Positional Arguments:
+            user (string): Username of the player.
+            score (int): Score the player got.
+
+        Returns:
+            int: Place of the score among the scores returned by get_scores,
+                 starting at 0, or None if it is not one of them.
+        """
+
+        with self.lock, self.connection:
+
+            self.connection.execute(
+                "INSERT INTO scores (board, user, score) VALUES (?, ?, ?)",
+                (self.board, str(user), int(score)))
+
+            self.changes += 1
+
+        # Newer scores go before older equal scores
+        index = self.rank(score) - 1
+
+        if index < self.capacity:
+
+            return index
+
+        return None
+
+    def get_scores (self):
+        """
+        Get the best scores of the board.
+
+        Returns:
+            list: Up to capacity [user, score] pairs, best score first.
+        """
+
+        with self.lock:
+
+            rows = self.connection.execute(
+                "SELECT user, score FROM scores WHERE board = ? "
+                "ORDER BY score DESC, id DESC LIMIT ?",
+                (self.board, self.capacity)).fetchall()
+
+        return [[user, score] for user, score in rows]
+
+    def refresh (self):
+        """
+        Scores are always read from the database, so there is nothing to read
+        again. Present so every highscore backend has the same methods.
+
+        Returns:
+            boolean: Always False.
+        """
+
+        return False
+
+    def flush (self):
+        """
+        Scores are committed to the database as soon as they are added, and
+        SQLite's journal keeps the database intact if the program is cut off
+        mid write. Present so every highscore backend has the same methods.
+        """
+
+        return
+
+    def version (self):
+        """
+        Get a value that changes whenever scores are added to the database,
+        by this leaderboard or by any other connection.
+
+        Returns:
+            tuple: Version of the scores.
+        """
+
+        with self.lock:
+
+            data_version = self.connection.execute(
+                "PRAGMA data_version").fetchone()[0]
+
+        return (self.changes, data_version)
+
+    def rank (self, score):
+        """
+        Get the place a score has on the board, counting every score ever
+        saved. Only the part of the score index above the score is read.
+
+        Positional Arguments:
+            score (int): Score to look up.
+
+        Returns:
+            int: Place of the score, starting at 1.
+        """
+
+        with self.lock:
+
+            better = self.connection.execute(
+                "SELECT COUNT(*) FROM scores WHERE board = ? AND score > ?",
+                (self.board, int(score))).fetchone()[0]
+
+        return better + 1
+
+    def count (self):
+        """
+        Get the number of scores saved to the board.
+
+        Returns:
+            int: Number of scores.
+        """
+
+        with self.lock:
+
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM scores WHERE board = ?",
+                (self.board,)).fetchone()[0]
+
+    def close (self):
+        """
+        Close the connection to the database.
+        """
+
+        with self.lock:
+
+            self.connection.close()
+
+class MenuManager:
+    """
+    Menu manager for pygame.
+
+    Attributes:
+        pages (List): List of pages in the menu manager.
+        page_registry (dict): Maps page ids to the pages in the menu manager.
+        history (deque): IDs of the pages visited before the current page, most
+                         recent last. Holds at most HISTORY_SIZE ids.
+        page_factories (dict): Maps page ids to functions that build the page
+                               the first time it is visited.
+        page_unload_timeout (int): Milliseconds after which a page built by a
+                                   factory is unloaded if it has not been
+                                   visited, or None to keep pages loaded.
+        page_visit_times (dict): Maps page ids to the pygame.time.get_ticks()
+                                 time the page was last shown.
+        highscore_list (List): [user, score] pairs shown on the highscore
+                               page, best score first. Never holds more than
+                               num_highscores pairs.
+        num_highscores (int): Number of scores kept and shown.
+        highscore_store (HighscoreStore): Storage for the highscores, or None
+                                          if no highscore page was added. Can
+                                          be any highscore backend, such as
+                                          SQLiteLeaderboard.
+        highscore_version (object): Version of the highscore store the
+                                    highscore page was last updated from.
+        highscore_rows (List): Text elements on the highscore page, one per
+                               score, reused when the scores change.
+        highscore_font (pygame.font.Font): Font of the highscore page.
+        highscore_back_page_id (String/Int): ID of the page the back button of
+                                             the highscore page goes to.
+        current_page (Page): Page currently being displayed.
+        screen (pygame.display): Surface to blit the pages and game to.
+        clock (pygame.time.Clock): Used to set/cap game FPS.
+        start_page_set (Boolean): Switch that checks if start page has been set.
+        dirty_rendering (Boolean): True if only changed areas of the screen are
+                                   redrawn each frame.
+        displayed_page (Page): Page that is currently on the screen, or None if
+                               the screen has to be redrawn in full.
+        display_format (tuple): Display format the element images were last
+                                converted to.
+        idle_mode (Boolean): True if the menu waits for events instead of
+                             redrawing at a fixed frame rate.
+        idle_timeout (int): Longest time in milliseconds to wait for an event
+                            in idle mode.
+        redraw_needed (Boolean): True if something changed since the last frame
+                                 was drawn in idle mode.
+        tasks (set): asyncio tasks of coroutine button actions that have not
+                     finished yet.
+        task_error (Exception): Exception raised by a coroutine button action
+                                task, or None. handle_events raises it again.
+        frame_stats (FrameStats): Timings of the last frames of the menu loop.
+        stats_overlay (Boolean): True if a summary of frame_stats is drawn in
+                                 the top left corner of the screen.
+        input_recorder (InputRecorder): Records the events the menu handles,
+                                        or None if input is not recorded.
+        menu_loaders (list): MenuLoaders whose definition and asset files are
+                             watched for changes. See load_menus.
+    """
+
+    def __init__ (self, screen, clock):
+        """
+        Instantiate a MenuManager object.
+
+        Positional Arguments:
+            screen (pygame.Surface): Surface we are blitting objects to.
+            clock (pygame.time.Clock): Pygame clock.
+
+        Keyword Arguments:
+            background_color (list): Background color for the menu system.
+                                     Should be supplied as a list of three
+                                     integers. Default is black.
+
+        NOTE: For the menu manager system to work as intended, you will want to
+              use the same screen and clock objects for the menu manager and
+              your game.
+        """
+
+        self.screen = screen
+        self.clock = clock
+        self.background_color = menu_manager_settings["menu_background_color"]
+        self.pages = list()
+        self.page_registry = dict()
+        self.history = deque(maxlen = HISTORY_SIZE)
+        self.page_factories = dict()
+        self.page_unload_timeout = None
+        self.page_visit_times = dict()
+        self.current_page = None
+        self.start_page = None
+        self.exiting = False
+        self.screen_width, self.screen_height = pygame.display.get_surface().get_size()
+        self.highscore_list = list()
+        self.num_highscores = 5
+        self.highscore_store = None
+        self.highscore_version = None
+        self.highscore_rows = list()
+        self.highscore_font = None
+        self.highscore_back_page_id = None
+        self.dirty_rendering = False
+        self.displayed_page = None
+        self.display_format = None
+        self.idle_mode = False
+        self.idle_timeout = IDLE_TIMEOUT
+        self.redraw_needed = True
+        self.tasks = set()
+        self.task_error = None
+        self.frame_stats = FrameStats()
+        self.stats_overlay = False
+        self.input_recorder = None
+        self.menu_loaders = list()
+
+    def run (self):
+        """
+        Update and display the menu system. Puts the menu loop into a function
+        for ease of use.
+        """
+
+        # The game has drawn over the screen since the last run
+        self.displayed_page = None
+        self.redraw_needed = True
+
+        while True:
+
+            self.frame_stats.start_frame()
+
+            if not self.__update():
+
+                break
+
+            if self.__display():
+
+                start = time.perf_counter()
+                self.clock.tick(menu_manager_settings["menu_fps"])
+                self.frame_stats.add_time("wait", time.perf_counter() - start)
+
+            self.__end_frame()
+
+    async def run_async (self):
+        """
+        Update and display the menu system from an asyncio event loop. Works
+        like run, but waits for the next frame with asyncio.sleep instead of
+        the clock, so other tasks on the event loop keep running while the
+        menu is shown. Frames are timed from a fixed schedule, so the frame
+        rate does not drift below menu_manager_settings["menu_fps"].
+
+        Button actions that are coroutine functions are scheduled as tasks
+        and are not waited for.
+
+        NOTE: In idle mode the menu still wakes up every frame to check for
+              events, but only draws when something changed.
+        """
+
+        # The game has drawn over the screen since the last run
+        self.displayed_page = None
+        self.redraw_needed = True
+
+        loop = asyncio.get_running_loop()
+        frame_time = 1 / menu_manager_settings["menu_fps"]
+        next_frame = loop.time()
+
+        while True:
+
+            self.frame_stats.start_frame()
+
+            if not self.__update(wait = False):
+
+                break
+
+            self.__display()
+
+            next_frame += frame_time
+            now = loop.time()
+
+            # Running behind, start a new schedule instead of catching up
+            if next_frame < now:
+
+                next_frame = now
+
+            start = time.perf_counter()
+            await asyncio.sleep(next_frame - now)
+            self.frame_stats.add_time("wait", time.perf_counter() - start)
+
+            self.__end_frame()
+
+    def add_page (self, new_page):
+        """
+        Adds a page to the menu manager.
+
+        Arguments:
+            new_page (Page): Page to be added to the menu manager.
+
+        Prerequisites:
+            - No other page in the MenuManager has the same ID.
+        """
+
+        if new_page.id in self.page_registry or \
+           new_page.id in self.page_factories:
+
+            print("Duplicate page id, " + str(new_page.id) + "! Exiting.")
+            exit(-1)
+
+        self.pages.append(new_page)
+        self.page_registry[new_page.id] = new_page
+
+    def add_page_factory (self, page_id, factory):
+        """
+        Adds a page that is only built when it is first visited. Use this for
+        pages that are expensive to build (lots of pictures or text) and that
+        the player may never open.
+
+        Arguments:
+            page_id (String/Int): ID of the page the factory builds.
+            factory (function): Function taking no arguments that builds and
+                                returns the Page, with its elements added.
+
+        Prerequisites:
+            - No other page in the MenuManager has the same ID.
+            - The page returned by the factory has the ID page_id.
+        """
+
+        if page_id in self.page_registry or page_id in self.page_factories:
+
+            print("Duplicate page id, " + str(page_id) + "! Exiting.")
+            exit(-1)
+
+        self.page_factories[page_id] = factory
+
+    def set_page_unload_timeout (self, timeout):
+        """
+        Unload pages built by a page factory when they have not been visited
+        for a while. They are built again by their factory if they are visited
+        later.
+
+        Arguments:
+            timeout (int): Milliseconds a page can go without being visited
+                           before it is unloaded. None keeps every page loaded,
+                           which is the default.
+        """
+
+        self.page_unload_timeout = timeout
+
+    def set_start_page (self, page_id, show = True):
+        """
+        Set a start page for the menu manager. This function must be called
+        before calling ManuManager.run() or the program will be terminated.
+
+        Arguments:
+            page_id (String/Int): ID of the desired page destination.
+
+        Keyword Arguments:
+            show (Boolean): Show the start page and forget the navigation
+                            history. False only changes the page reset_to_start
+                            goes to. Default is True.
+
+        NOTE: See Page class for more info on page id's.
+        """
+
+        page = self.__load_page(page_id)
+
+        if page == None:
+
+            print("Invalid start page id!")
+            exit(-1)
+
+        self.start_page = page
+
+        if show:
+
+            self.__show_page(page)
+            self.history.clear()
+
+    def remove_page (self, page_id):
+        """
+        Remove a page from the menu manager, giving its images back to the
+        image cache. The page is also dropped from the navigation history. If
+        it is the current page, the menu goes back to the previous page, or to
+        the start page if there is none.
+
+        Arguments:
+            page_id (String/Int): ID of the page to remove. Does nothing if
+                                  there is no such page.
+        """
+
+        self.page_factories.pop(page_id, None)
+        self.page_visit_times.pop(page_id, None)
+        self.history = deque((history_id for history_id in self.history
+                              if history_id != page_id), maxlen = HISTORY_SIZE)
+
+        page = self.page_registry.get(page_id)
+
+        if page == None:
+
+            return
+
+        self.__unload_page(page)
+
+        if page is self.start_page:
+
+            self.start_page = None
+
+        if page is self.current_page:
+
+            self.current_page = None
+
+            if self.history:
+
+                self.back()
+
+            elif self.start_page != None:
+
+                self.__show_page(self.start_page)
+
+    def set_background_color (self, color):
+        """
+        Sets the background color for the menu pages.
+
+        Positional Arguments:
+            color (List): Background color for menu pages. List of 3 integers
+                          ranging from 0 to 255 inclusive.
+        """
+
+        # Type check
+        if not (type(color) is list):
+
+            print("Error in set_background_color: Background color is not list!")
+            exit(-1)
+
+        if (len(color) != 3):
+
+            print("Error in set_backgro")
+            exit(-1)
+
+        self.background_color = color
+        self.displayed_page = None
+
+    def set_dirty_rendering (self, enabled):
+        """
+        Turns dirty rectangle rendering on or off. When it is on, only the
+        areas of the screen where elements moved or changed their text or image
+        are redrawn and pushed to the display. A menu page that is not changing
+        costs almost nothing to display.
+
+        Positional Arguments:
+            enabled (boolean): True to only redraw changed areas, False to
+                               redraw the whole screen every frame.
+
+        NOTE: Changes are tracked through the element methods (set_pos,
+              set_text, set_picture). If you change an element's rect or image
+              directly, call mark_dirty on the element afterwards, with no
+              arguments. This also lets the pages find a button under the
+              mouse at its new position, whether or not dirty rendering is on.
+        """
+
+        self.dirty_rendering = enabled
+        self.displayed_page = None
+
+    def set_idle_mode (self, enabled, timeout = IDLE_TIMEOUT):
+        """
+        Turns idle mode on or off. In idle mode the menu loop sleeps until an
+        event arrives instead of polling and redrawing every frame, and only
+        draws a new frame when a button was clicked or the window needs to be
+        repainted. A menu nobody is touching uses next to no CPU.
+
+        Positional Arguments:
+            enabled (boolean): True to wait for events, False to redraw every
+                               frame.
+
+        Keyword Arguments:
+            timeout (int): Longest time in milliseconds to wait for an event
+                           before checking the menu state again. Default is
+                           500.
+        """
+
+        self.idle_mode = enabled
+        self.idle_timeout = timeout
+        self.redraw_needed = True
+
+    def set_stats_overlay (self, enabled):
+        """
+        Turns the frame stats overlay on or off. The overlay shows the frame
+        rate and the average time of each phase of a frame in the top left
+        corner of the screen.
+
+        Positional Arguments:
+            enabled (boolean): True to draw the overlay.
+
+        NOTE: The overlay changes every frame, so while it is shown the whole
+              screen is redrawn every frame, even in dirty rendering and idle
+              mode.
+        """
+
+        self.stats_overlay = enabled
+        self.displayed_page = None
+        self.redraw_needed = True
+
+    def stats (self):
+        """
+        Get a summary of where the time of the last frames of the menu loop
+        went. Frames are recorded by run and run_async.
+
+        Returns:
+            dict: See FrameStats.summary.
+        """
+
+        return self.frame_stats.summary()
+
+    def record_input (self, filename):
+        """
+        Start recording the events the menu handles to a file, so the session
+        can be played back later with replay_input. Stops any recording that
+        was already running.
+
+        Positional Arguments:
+            filename (string): Path of the recording file.
+        """
+
+        self.stop_recording()
+
+        self.input_recorder = InputRecorder(filename)
+
+    def stop_recording (self):
+        """
+        Stop recording input and close the recording file.
+        """
+
+        if self.input_recorder != None:
+
+            self.input_recorder.close()
+            self.input_recorder = None
+
+    def replay_input (self, filename):
+        """
+        Play back a recording made with record_input, as fast as possible and
+        without waiting for the clock. Every recorded frame is handled and
+        drawn, with the events recorded for it, so the same session always
+        takes the same steps. Use this to compare the frame times of different
+        versions of the menu system or of the menus.
+
+        The menu starts from the start page. Recorded pygame.QUIT events are
+        ignored, and when a button calls exit_menu the menu goes back to the
+        start page, as it would the next time it is run.
+
+        Positional Arguments:
+            filename (string): Path of the recording file.
+
+        Returns:
+            dict: Summary of the timings of every replayed frame, see
+                  FrameStats.summary.
+
+        Prerequisites:
+            - The menu manager holds the same pages as when the recording was
+              made. A start page has been set.
+        """
+
+        frames = load_input_recording(filename)
+
+        self.stop_recording()
+        self.reset_to_start()
+        self.displayed_page = None
+        self.redraw_needed = True
+
+        # Keep every replayed frame, not only the last few
+        live_stats = self.frame_stats
+        self.frame_stats = FrameStats(max(len(frames), 1))
+
+        for events in frames:
+
+            self.frame_stats.start_frame()
+
+            # Background actions started by the replay finish for real
+            events = events + pygame.event.get(BACKGROUND_ACTION_DONE)
+
+            start = time.perf_counter()
+            self.handle_events(events)
+            self.frame_stats.add_time("events", time.perf_counter() - start)
+
+            if self.exiting:
+
+                self.reset_to_start()
+
+            self.__display()
+            self.__end_frame()
+
+        summary = self.frame_stats.summary()
+        self.frame_stats = live_stats
+
+        return summary
+
+    def load_menus (self, filename, actions = None, hot_reload = False):
+        """
+        Add the pages of a menu definition file to the menu manager. See
+        MenuLoader for the format of the file.
+
+        Positional Arguments:
+            filename (string): Path of the JSON or TOML definition file.
+
+        Keyword Arguments:
+            actions (dict): Functions the definition can use as actions, by
+                            name. Default is None, for only the menu manager's
+                            own actions.
+            hot_reload (boolean): Watch the definition file and the image and
+                                  font files it uses while the menu runs, and
+                                  update the pages when they change. The
+                                  current page and navigation history are
+                                  kept. Meant for designing menus, as the
+                                  files are checked every HOT_RELOAD_INTERVAL
+                                  milliseconds. Default is False.
+
+        Returns:
+            MenuLoader: The loader that built the pages.
+        """
+
+        loader = MenuLoader(self, actions)
+        loader.load(filename)
+
+        if hot_reload:
+
+            self.menu_loaders.append(loader)
+
+        return loader
+
+    def navigate (self, page_id):
+        """
+        Sets the currently showing page using the id attribute of Page class.
+
+        Arguments:
+            page_id (String/Int): ID of the desired page destination.
+
+        NOTE: See Page class for more info on page id's.
+        """
+
+        page = self.__get_page(page_id)
+
+        # Remember where we came from so back() can return there
+        if self.current_page != None and page is not self.current_page:
+
+            self.history.append(self.current_page.id)
+
+        self.__show_page(page)
+
+    def back (self):
+        """
+        Return to the page that was showing before the last call to navigate.
+        Does nothing if there is no page to go back to.
+        """
+
+        if self.history:
+
+            self.__show_page(self.__get_page(self.history.pop()))
+
+    def replace (self, page_id):
+        """
+        Show another page without adding the current page to the history, so
+        back() skips the current page.
+
+        Arguments:
+            page_id (String/Int): ID of the desired page destination.
+        """
+
+        self.__show_page(self.__get_page(page_id))
+
+    def reset_to_start (self):
+        """
+        Show the start page and forget the navigation history. Also clears the
+        exiting flag set by exit_menu.
+        """
+
+        self.exiting = False
+        self.__show_page(self.start_page)
+        self.history.clear()
+
+    def __get_page (self, page_id):
+        """
+        Look up a page by ID. Terminates the program if there is no page with
+        that ID.
+
+        Arguments:
+            page_id (String/Int): ID of the page.
+
+        Returns:
+            Page: The page with the ID.
+        """
+
+        page = self.__load_page(page_id)
+
+        if page == None:
+
+            print("Invalid page id, " + str(page_id) + "! Exiting.")
+            exit(-1)
+
+        return page
+
+    def __load_page (self, page_id):
+        """
+        Look up a page by ID, building it with its page factory if it has not
+        been built yet.
+
+        Arguments:
+            page_id (String/Int): ID of the page.
+
+        Returns:
+            Page: The page with the ID, or None if there is no such page.
+        """
+
+        page = self.page_registry.get(page_id)
+
+        if page == None and page_id in self.page_factories:
+
+            page = self.page_factories[page_id]()
+
+            if page.id != page_id:
+
+                print("Page factory for " + str(page_id) + \
+                      " built a page with id " + str(page.id) + "! Exiting.")
+                exit(-1)
+
+            self.pages.append(page)
+            self.page_registry[page_id] = page
+
+        return page
+
+    def __show_page (self, page):
+        """
+        Make a page the current page, and unload factory pages that have not
+        been visited for longer than the unload timeout.
+
+        Arguments:
+            page (Page): Page to show.
+        """
+
+        now = pygame.time.get_ticks()
+
+        if self.current_page != None:
+
+            self.page_visit_times[self.current_page.id] = now
+
+        self.current_page = page
+        self.page_visit_times[page.id] = now
+
+        if self.page_unload_timeout == None:
+
+            return
+
+        for page_id in self.page_factories:
+
+            loaded_page = self.page_registry.get(page_id)
+
+            if loaded_page == None or loaded_page is self.current_page or \
+               loaded_page is self.start_page:
+
+                continue
+
+            if now - self.page_visit_times.get(page_id, now) > \
+               self.page_unload_timeout:
+
+                self.__unload_page(loaded_page)
+
+    def __unload_page (self, page):
+        """
+        Remove a page from the MenuManager and give its images back to the
+        image cache.
+
+        Arguments:
+            page (Page): Page to unload.
+        """
+
+        elements = page.get_elements()
+        page.clear()
+
+        for element in elements:
+
+            if hasattr(element, "release_image") and not element.pages:
+
+                element.release_image()
+
+        self.pages.remove(page)
+        del self.page_registry[page.id]
+
+        if self.displayed_page is page:
+
+            self.displayed_page = None
+
+    def exit_menu (self):
+        """
+        For exiting the menu manager. Flips the exiting flag.
+        """
+
+        self.exiting = True
+
+    def kill_program (self):
+        """
+        Terminates the entire program, after waiting for saved highscores to be
+        written and finishing the input recording.
+        """
+
+        self.flush_highscores()
+        self.stop_recording()
+
+        exit()
+
+    def flush_highscores (self):
+        """
+        Wait until every saved highscore has been written to storage. Call this
+        before your game exits if it does not exit through kill_program.
+        """
+
+        if self.highscore_store != None:
+
+            self.highscore_store.flush()
+
+    def add_highscore_page (self, button, back_page_id, font,
+                            num_highscores = 5,
+                            highscore_file = HIGHSCORE_FILE,
+                            leaderboard = None):
+        """
+        Adds a highscore page to the MenuManager.
+
+        Positional Arguments:
+            button (ButtonText, ButtonPicture): The button you want to use to
+                                                navigate to the highscore page.
+            back_page_id (Page): The highscore page has a back button.
+                                 "back_page_id" should be the ID of the page you
+                                 want to return to when the back button is
+                                 pressed.
+            font (pygame.font.Font/Sysfont): Font used to render the Text
+                                             objects on the highscore page.
+
+        Keyword Arguments:
+            num_highscores (int): Number of scores to keep and show. Default
+                                  is 5.
+            highscore_file (string): Path to the file where highscores are
+                                     saved. Default is HIGHSCORE_FILE.
+            leaderboard (HighscoreStore, SQLiteLeaderboard): Highscore backend
+                                             to use instead of the highscore
+                                             file, for example a
+                                             HighscoreStore with another fsync
+                                             policy. Its capacity should match
+                                             num_highscores. Default is None.
+
+        Prerequisites:
+            - The button passed as the "button" argument should be of type
+              ButtonText or ButtonPicture.
+            - The page with ID back_page_id should be a page that is already in
+              the MenuManager.
+        """
+
+        # Save highscore stuff to the MenuManager instance
+        self.num_highscores = num_highscores
+        self.highscore_font = font
+        self.highscore_back_page_id = back_page_id
+
+        if leaderboard != None:
+
+            self.highscore_store = leaderboard
+
+        else:
+
+            self.highscore_store = HighscoreStore(highscore_file,
+                                                  num_highscores)
+
+        # Create the highscore page and add it to the MenuManager
+        highscore_page = Page("highscores", baked = True)
+        self.add_page(highscore_page)
+
+        # Add navigation action to the button, picking up scores saved by
+        # other games first
+        button.add_action(self.refresh_highscores)
+        button.add_action(self.navigate, "highscores")
+
+        # Create the UI elements for the scores read in by the store
+        self.refresh_highscores()
+
+    def save_highscore (self, user, score):
+        """
+        Saves a score to the highscores file.
+
+        Positional Arguments:
+            user (string): Username of the player.
+            score (int): Score the player got.
+
+        Prerequisites:
+            - add_highscore_page has been called.
+        """
+
+        if self.highscore_store == None:
+
+            print("Error in save_highscore: No highscore page has been added!")
+            exit(-1)
+
+        self.highscore_store.add(user, score)
+
+        self.refresh_highscores()
+
+    def refresh_highscores (self):
+        """
+        Update highscore_list and the highscore page if the highscores changed,
+        either through save_highscore or because the highscore storage was
+        changed from outside the game. Does nothing if the scores are the same
+        as the last time the page was updated.
+        """
+
+        if self.highscore_store == None:
+
+            return
+
+        self.highscore_store.refresh()
+        version = self.highscore_store.version()
+
+        if version != self.highscore_version:
+
+            self.highscore_version = version
+            self.__import_highscores()
+
+    def get_highscore_rank (self, score):
+        """
+        Get the place a score has among the saved highscores.
+
+        Positional Arguments:
+            score (int): Score to look up.
+
+        Returns:
+            int: Place of the score, starting at 1. With the default highscore
+                 file only the kept scores are ranked, and None is returned
+                 for scores that would not be kept.
+
+        Prerequisites:
+            - add_highscore_page has been called.
+        """
+
+        if self.highscore_store == None:
+
+            print("Error in get_highscore_rank: No highscore page has been added!")
+            exit(-1)
+
+        return self.highscore_store.rank(score)
+
+    def __import_highscores (self):
+        """
+        Get the highscores from the highscore store and update the UI elements
+        for those usernames and highscores. Existing rows are reused, and only
+        rows whose text changed are rendered again and moved.
+        """
+
+        highscore_page = self.page_registry.get("highscores")
+
+        self.highscore_list = self.highscore_store.get_scores()
+
+        screen_center_x = self.screen_width / 2
+        vert_division = self.screen_height / (self.num_highscores + 1)
+
+        # Create the back button the first time the page is filled
+        if not highscore_page.get_elements():
+
+            button_back = ButtonText("Back", self.highscore_font,
+                                     pos = [10, 10])
+            button_back.add_action(self.navigate, self.highscore_back_page_id)
+            highscore_page.add_element(button_back)
+
+        # Only rows whose text changed are rendered again
+        for i in range(len(self.highscore_list)):
+
+            text = str(self.highscore_list[i][0]) + " " + \
+                   str(self.highscore_list[i][1])
+
+            if i < len(self.highscore_rows):
+
+                score = self.highscore_rows[i]
+
+                if score.get_text() == text:
+
+                    continue
+
+                score.set_text(text, self.highscore_font)
+
+            else:
+
+                score = Text(text, self.highscore_font)
+                self.highscore_rows.append(score)
+                highscore_page.add_element(score)
+
+            dims = score.get_dimensions()
+            pos_x = screen_center_x - ((1/2) * dims[0])
+            pos_y = ((i + 1) * vert_division) - ((1/2) * dims[1])
+
+            if score.get_pos() != [int(pos_x), int(pos_y)]:
+
+                score.set_pos([pos_x, pos_y])
+
+        # Drop rows for scores that are gone
+        while len(self.highscore_rows) > len(self.highscore_list):
+
+            highscore_page.remove_element(self.highscore_rows.pop())
+
+    def handle_events (self, events):
+        """
+        Handle one frame of events without running the menu loop. Together
+        with draw, this lets a game show the menu over its own screen, such as
+        a pause menu, while keeping its own loop, event polling and frame rate.
+
+        Left clicks on buttons of the current page run the buttons' actions
+        and are used up, as are BACKGROUND_ACTION_DONE events, which call the
+        callbacks of finished background actions. Every other event is handed
+        back, including pygame.QUIT, so the game can handle it. If a button
+        calls exit_menu, exiting is True afterwards; call reset_to_start to
+        clear it.
+
+        If input is being recorded, the events are added to the recording as
+        one frame. Menus loaded with hot_reload are updated here when their
+        files changed. If a coroutine button action running as an asyncio task
+        raised an exception, it is raised again here, like the exceptions of
+        other actions.
+
+        Positional Arguments:
+            events (list): Pygame events of this frame, usually the result of
+                           pygame.event.get().
+
+        Returns:
+            list: The events the menu did not use, in order.
+
+        Prerequisites:
+            - A start page has been set.
+        """
+
+        # Ensure start page has been set
+        if self.start_page == None:
+
+            print("Start page not set!")
+            exit(-1)
+
+        if self.task_error != None:
+
+            error = self.task_error
+            self.task_error = None
+
+            raise error
+
+        if self.input_recorder != None:
+
+            self.input_recorder.record(events)
+
+        for loader in self.menu_loaders:
+
+            if loader.check_for_changes():
+
+                self.displayed_page = None
+                self.redraw_needed = True
+
+        unused_events = list()
+
+        for event in events:
+
+            # Window contents were lost or resized
+            if event.type in REDRAW_EVENTS:
+
+                self.displayed_page = None
+                self.redraw_needed = True
+
+            # A background action finished, hand its result to the callback
+            if event.type == BACKGROUND_ACTION_DONE:
+
+                if event.button != None:
+
+                    result = event.button.finish_background_action(
+                        event.action, event.future)
+
+                else:
+
+                    result = event.action.finish(event.future)
+
+                if inspect.isawaitable(result):
+
+                    self.__run_awaitable(result)
+
+                self.redraw_needed = True
+
+                continue
+
+            # Left mouse click
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+
+                buttons = [button for button in
+                           self.current_page.get_clicked_buttons(event.pos)
+                           if not button.is_busy()]
+
+                for button in buttons:
+
+                    for result in button.execute_actions():
+
+                        if inspect.isawaitable(result):
+
+                            self.__run_awaitable(result)
+
+                if buttons:
+
+                    self.redraw_needed = True
+
+                    continue
+
+            unused_events.append(event)
+
+        return unused_events
+
+    def __run_awaitable (self, awaitable):
+        """
+        Run what a coroutine button action returned. If an asyncio event loop
+        is running, it is scheduled as a task and the menu goes on. Otherwise
+        it is run to the end right away.
+
+        Positional Arguments:
+            awaitable (awaitable): Coroutine returned by the action.
+        """
+
+        try:
+
+            asyncio.get_running_loop()
+
+        except RuntimeError:
+
+            asyncio.run(self.__await(awaitable))
+
+            return
+
+        task = asyncio.ensure_future(awaitable)
+
+        # The event loop only keeps weak references to its tasks
+        self.tasks.add(task)
+        task.add_done_callback(self.__task_done)
+
+    async def __await (self, awaitable):
+        """
+        Wait for an awaitable. asyncio.run only takes coroutines, this turns
+        any awaitable into one.
+
+        Positional Arguments:
+            awaitable (awaitable): What to wait for.
+
+        Returns:
+            object: Result of the awaitable.
+        """
+
+        return await awaitable
+
+    def __task_done (self, task):
+        """
+        Forget a finished action task and redraw, since the action may have
+        changed the page. If the task raised an exception, it is kept for
+        handle_events to raise on the game's side of the event loop.
+
+        Positional Arguments:
+            task (asyncio.Task): The finished task.
+        """
+
+        self.tasks.discard(task)
+        self.redraw_needed = True
+
+        if not task.cancelled() and task.exception() != None and \
+           self.task_error == None:
+
+            self.task_error = task.exception()
+
+    def draw (self, surface):
+        """
+        Draw the current page over what is already on a surface. Nothing is
+        filled, flipped or waited for, so the game can draw its own screen
+        first and update the display once per frame.
+
+        Positional Arguments:
+            surface (pygame.Surface): Surface to draw the page on.
+        """
+
+        # Elements created before the display existed, or for another mode
+        if self.display_format != display_format():
+
+            self.convert_images()
+
+        self.current_page.display(surface)
+
+        # Dirty rendering can not tell what the game drew over
+        self.displayed_page = None
+
+    def convert_images (self):
+        """
+        Convert the images of every element on every page to the current
+        display format. This happens automatically the first frame after the
+        display is created or its pixel format changes.
+        """
+
+        self.display_format = display_format()
+
+        for page in self.pages:
+
+            page.convert_images()
+
+        self.displayed_page = None
+
+    def __display (self):
+        """
+        Blit everything from backend to the screen.
+
+        Returns:
+            boolean: True if a frame was drawn, False if idle mode skipped it.
+        """
+
+        busy_buttons = self.current_page.get_busy_buttons()
+
+        # Spinners of busy buttons turn every frame
+        for button in busy_buttons:
+
+            self.current_page.mark_dirty(button, changed = False)
+
+        if busy_buttons:
+
+            self.redraw_needed = True
+
+        # The overlay changes every frame and covers part of the page
+        if self.stats_overlay:
+
+            self.displayed_page = None
+            self.redraw_needed = True
+
+        # Nothing changed since the last frame, so there is nothing to draw
+        if self.idle_mode and not self.redraw_needed:
+
+            return False
+
+        self.redraw_needed = False
+
+        start = time.perf_counter()
+        self.current_page.blit_count = 0
+
+        # Elements created before the display existed, or for another mode
+        if self.display_format != display_format():
+
+            self.convert_images()
+
+        if self.dirty_rendering:
+
+            # A page that was not on screen last frame is drawn in full
+            if self.current_page is not self.displayed_page:
+
+                self.current_page.full_redraw = True
+                self.displayed_page = self.current_page
+
+            dirty_rects = self.current_page.display_dirty(self.screen,
+                                                          self.background_color)
+
+            if self.stats_overlay:
+
+                self.__draw_stats_overlay()
+
+            draw_end = time.perf_counter()
+            self.frame_stats.add_time("draw", draw_end - start)
+
+            if dirty_rects:
+
+                pygame.display.update(dirty_rects)
+
+            self.frame_stats.add_time("present", time.perf_counter() - draw_end)
+
+            return True
+
+        # Display current screen over the background
+        self.current_page.display(self.screen, self.background_color)
+
+        if self.stats_overlay:
+
+            self.__draw_stats_overlay()
+
+        draw_end = time.perf_counter()
+        self.frame_stats.add_time("draw", draw_end - start)
+
+        pygame.display.flip()
+
+        self.frame_stats.add_time("present", time.perf_counter() - draw_end)
+
+        return True
+
+    def __draw_stats_overlay (self):
+        """
+        Draw a summary of the frame stats in the top left corner of the
+        screen.
+        """
+
+        summary = self.stats()
+        font = font_registry.resolve(STATS_FONT)
+
+        lines = [
+            f"{summary['fps']:.1f} fps, frame "
+            f"{summary['frame']['average']:.2f} ms "
+            f"(max {summary['frame']['max']:.2f} ms)",
+            ", ".join(f"{phase} {summary[phase]['average']:.2f}"
+                      for phase in STATS_PHASES) + " ms",
+            f"{summary['blits']:.1f} blits, {summary['elements']} elements"
+        ]
+
+        y = 0
+
+        # Rendered directly, the numbers change too often for text_cache
+        for line in lines:
+
+            image = font.render(line, True, WHITE, BLACK)
+            self.screen.blit(image, [0, y])
+            y += image.get_height()
+
+    def __end_frame (self):
+        """
+        Add the frame that was just drawn to the frame stats.
+        """
+
+        self.frame_stats.end_frame(self.current_page.blit_count,
+                                   len(self.current_page.elements))
+        self.current_page.blit_count = 0
+
+    def __update (self, wait = True):
+        """
+        Handles user events. Also checks if a start page has been set. This
+        function will prevent the program from running if a sart page has not
+        beem set.
+
+        Keyword Arguments:
+            wait (boolean): Allow waiting for events in idle mode. Default is
+                            True.
+
+        Returns:
+            boolean: True if program execution should continue, False otherwise.
+        """
+
+        # Ensure start page has been set
+        if self.start_page == None:
+
+            print("Start page not set!")
+            exit(-1)
+
+        # Exit procedures, resets current page to start page
+        if self.exiting:
+
+            self.reset_to_start()
+
+            return False
+
+        events = self.__get_events(wait)
+
+        start = time.perf_counter()
+
+        for event in self.handle_events(events):
+
+            # Window close
+            if event.type == pygame.QUIT:
+
+                self.kill_program()
+
+        self.frame_stats.add_time("events", time.perf_counter() - start)
+
+        return True
+
+    def __get_events (self, wait = True):
+        """
+        Get the pending user events. In idle mode, when nothing has to be
+        redrawn, this blocks until an event arrives or the idle timeout runs
+        out.
+
+        Keyword Arguments:
+            wait (boolean): Allow blocking in idle mode. Default is True.
+
+        Returns:
+            list: Pygame events to handle.
+        """
+
+        if not wait or not self.idle_mode or self.redraw_needed or \
+           self.current_page.get_busy_buttons():
+
+            return pygame.event.get()
+
+        start = time.perf_counter()
+        event = pygame.event.wait(self.idle_timeout)
+        self.frame_stats.add_time("wait", time.perf_counter() - start)
+
+        if event.type == pygame.NOEVENT:
+
+            return []
+
+        return [event] + pygame.event.get()
+
+class Page:
+    """
+    Page object for menu manager.
+
+    Attributes:
+        id (string/int): ID for this page.
+        elements (list): List of elements on the page.
+        dirty_rects (list): Areas of the page that changed since it was last
+                            drawn with display_dirty.
+        full_redraw (boolean): True if the whole page has to be redrawn the
+                               next time display_dirty is called.
+        baked (boolean): True if the page keeps a pre-drawn copy of its
+                         elements and background.
+        baked_surface (pygame.Surface): Pre-drawn copy of the page, or None if
+                                        it has to be drawn again.
+        baked_background_color (list): Background color the baked surface was
+                                       drawn with.
+        button_grid (dict): Buttons on the page sorted into a grid of
+                            GRID_CELL_SIZE squares, for finding the buttons
+                            under the mouse without checking every element.
+                            Maps (column, row) to a list of buttons.
+        button_order (dict): Position of each button in the elements list, so
+                             clicked buttons run in the order they were added.
+        button_rects (dict): Area each button was sorted into the grid with.
+                             Maps buttons to a copy of their rect.
+        blit_count (int): Number of blits done to draw the page. MenuManager
+                          sets it back to 0 every frame.
+
+    NOTE: The ID doesn't have to be a string/int, it just has to be some
+          distinct identifier for this page. I just recommend using a string or
+          an integer for simplicity and readability.
+    """
+
+    def __init__ (self, id, baked = False):
+        """
+        Instantiate a page object.
+
+        Positional Arguments:
+            id (string/int): ID for this page.
+
+        Keyword Arguments:
+            baked (boolean): If True, the background and all elements of the
+                             page are drawn once onto a cached surface, and
+                             displaying the page is a single blit. The cache is
+                             redrawn whenever an element is added, moved or
+                             changed. Good for pages with many elements that
+                             rarely change. Default is False.
+        """
+
+        self.id = id
+        self.elements = list()
+        self.dirty_rects = list()
+        self.full_redraw = True
+        self.baked = baked
+        self.baked_surface = None
+        self.baked_background_color = None
+        self.button_grid = dict()
+        self.button_rects = dict()
+        self.button_order = dict()
+        self.blit_count = 0
+
+    def get_id (self):
+        """
+        Get the ID of the Page.
+
+        Returns:
+            id (Int/String): ID of the Page.
+        """
+
+        return self.id
+
+    def get_elements (self):
+        """
+        Get the elements in the Page.
+
+        Returns:
+            elements (list): List of elements in the Page.
+        """
+
+        return self.elements
+
+    def add_element (self, new_element):
+        """
+        Adds an element to the page.
+
+        Positional Arguments:
+            new_element (Button): Element to add to the page.
+        """
+
+        self.elements.append(new_element)
+
+        if hasattr(new_element, "pages"):
+
+            new_element.pages.append(self)
+
+        if isinstance(new_element, ButtonMixin):
+
+            self.button_order[new_element] = len(self.elements) - 1
+            self.__update_grid(new_element, new_element.rect)
+
+        self.mark_dirty(new_element)
+
+    def remove_element (self, element):
+        """
+        Removes an element from the page.
+
+        Positional Arguments:
+            element (Button, Picture, Text): Element to remove from the page.
+        """
+
+        self.elements.remove(element)
+
+        if hasattr(element, "pages") and self in element.pages:
+
+            element.pages.remove(self)
+
+        if element in self.button_order:
+
+            self.__update_grid(element, None)
+            del self.button_order[element]
+
+        self.mark_dirty(element)
+
+    def clear (self):
+        """
+        Removes all elements from the page.
+        """
+
+        for element in self.elements:
+
+            if hasattr(element, "pages") and self in element.pages:
+
+                element.pages.remove(self)
+
+        self.elements = list()
+        self.full_redraw = True
+        self.baked_surface = None
+        self.button_grid = dict()
+        self.button_rects = dict()
+        self.button_order = dict()
+
+    def get_clicked_buttons (self, mouse_pos):
+        """
+        Find the buttons on the page under a position. Only the buttons in the
+        grid cell of the position are checked.
+
+        Positional Arguments:
+            mouse_pos (list): XY position of the cursor.
+
+        Returns:
+            list: Buttons under the position, in the order they were added to
+                  the page.
+        """
+
+        cell = (int(mouse_pos[0]) // GRID_CELL_SIZE,
+                int(mouse_pos[1]) // GRID_CELL_SIZE)
+
+        clicked = list()
+
+        for button in self.button_grid.get(cell, ()):
+
+            if button.is_clicked(mouse_pos):
+
+                clicked.append(button)
+
+        clicked.sort(key = self.button_order.get)
+
+        return clicked
+
+    def get_busy_buttons (self):
+        """
+        Find the buttons on the page that are running a background action.
+
+        Returns:
+            list: Busy buttons, in no particular order.
+        """
+
+        return [button for button in self.button_order if button.is_busy()]
+
+    def mark_dirty (self, element, old_rect = None, changed = True):
+        """
+        Record the screen areas that changed because of an element. Called by
+        the elements themselves when they move or change their image. A button
+        whose rect no longer matches the area it was sorted into the button
+        grid with is sorted in again, so after changing a button's rect
+        directly, calling mark_dirty on it keeps it clickable.
+
+        Positional Arguments:
+            element (Button, Picture, Text): Element that changed.
+
+        Keyword Arguments:
+            old_rect (pygame.Rect): Area the element covered before the change.
+                                    Default is None, which for a button that
+                                    moved is the area it was sorted into the
+                                    grid with.
+            changed (boolean): False if only the spinner of a busy button has
+                               to be redrawn, which keeps the baked surface.
+                               Default is True.
+        """
+
+        if changed:
+
+            self.baked_surface = None
+
+        if element in self.button_order and \
+           self.button_rects.get(element) != element.rect:
+
+            # The rect was changed directly, the grid knows the old area
+            if old_rect == None:
+
+                old_rect = self.button_rects[element]
+
+            self.__update_grid(element, element.rect)
+
+        if self.full_redraw:
+
+            return
+
+        new_rect = element.rect.copy()
+
+        # Moving a short distance overlaps the old area, so redraw one area
+        if old_rect != None and old_rect.colliderect(new_rect):
+
+            new_rect.union_ip(old_rect)
+
+        elif old_rect != None:
+
+            self.dirty_rects.append(old_rect.copy())
+
+        self.dirty_rects.append(new_rect)
+
+        # Past this point redrawing the whole page is cheaper
+        if len(self.dirty_rects) > MAX_DIRTY_RECTS:
+
+            self.dirty_rects = list()
+            self.full_redraw = True
+
+    def convert_images (self):
+        """
+        Convert the images of all elements on the page to the current display
+        format and redraw the page in full the next time it is shown.
+        """
+
+        for element in self.elements:
+
+            if hasattr(element, "convert_image"):
+
+                element.convert_image()
+
+        self.baked_surface = None
+        self.full_redraw = True
+
+    def set_baked (self, baked):
+        """
+        Turns the pre-drawn page cache on or off. See __init__ for details.
+
+        Positional Arguments:
+            baked (boolean): True to draw the page from a cached surface.
+        """
+
+        self.baked = baked
+        self.baked_surface = None
+
+    def display (self, screen, background_color = None):
+        """
+        Show this screen in the window.
+
+        Positional Arguments:
+            screen (pygame.display): Surface to blit the elements to.
+
+        Keyword Arguments:
+            background_color (list): Color to fill the screen with before the
+                                     elements are drawn. Default is None, which
+                                     draws the elements over what is already on
+                                     the screen. Baked pages are only drawn
+                                     from their cache when a background color
+                                     is given.
+        """
+
+        if background_color == None:
+
+            self.__blit_elements(screen)
+
+        elif self.baked:
+
+            screen.blit(self.__get_baked_surface(screen, background_color),
+                        [0, 0])
+            self.blit_count += 1
+
+            # Busy buttons are left out of the baked surface
+            for button in self.get_busy_buttons():
+
+                screen.blit(button.image, [button.rect.x, button.rect.y])
+                draw_spinner(screen, button.rect)
+                self.blit_count += 1
+
+        else:
+
+            screen.fill(background_color)
+            self.__blit_elements(screen)
+
+    def display_dirty (self, screen, background_color):
+        """
+        Redraw only the areas of the page that changed since the last call.
+
+        Positional Arguments:
+            screen (pygame.display): Surface to blit the elements to.
+            background_color (list): Color used to clear the changed areas.
+
+        Returns:
+            list: pygame.Rect areas of the screen that were redrawn. Empty if
+                  nothing changed.
+        """
+
+        if self.full_redraw:
+
+            self.full_redraw = False
+            self.dirty_rects = list()
+
+            self.display(screen, background_color)
+
+            return [screen.get_rect()]
+
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = list()
+
+        if self.baked:
+
+            baked_surface = self.__get_baked_surface(screen, background_color)
+
+            for rect in dirty_rects:
+
+                screen.blit(baked_surface, rect, rect)
+
+            self.blit_count += len(dirty_rects)
+
+            # Busy buttons are left out of the baked surface
+            for button in self.get_busy_buttons():
+
+                screen.blit(button.image, [button.rect.x, button.rect.y])
+                draw_spinner(screen, button.rect)
+                self.blit_count += 1
+
+            return dirty_rects
+
+        old_clip = screen.get_clip()
+
+        for rect in dirty_rects:
+
+            # Clip so overlapping elements are not blended twice
+            screen.set_clip(rect)
+            screen.fill(background_color, rect)
+
+            for element in self.elements:
+
+                if element.rect.colliderect(rect):
+
+                    screen.blit(element.image, [element.rect.x, element.rect.y])
+                    self.blit_count += 1
+
+                    if element in self.button_order and element.is_busy():
+
+                        draw_spinner(screen, element.rect)
+
+        screen.set_clip(old_clip)
+
+        return dirty_rects
+
+    def __update_grid (self, button, new_rect):
+        """
+        Move a button from the grid cells of the area it was last sorted in
+        with to the cells covered by its new area.
+
+        Positional Arguments:
+            button (ButtonPicture, ButtonText): Button that was added or moved.
+            new_rect (pygame.Rect): New area of the button, or None if it was
+                                    removed from the page.
+        """
+
+        old_rect = self.button_rects.pop(button, None)
+
+        if old_rect != None:
+
+            for cell in self.__grid_cells(old_rect):
+
+                buttons = self.button_grid.get(cell)
+
+                if buttons != None and button in buttons:
+
+                    buttons.remove(button)
+
+                    if not buttons:
+
+                        del self.button_grid[cell]
+
+        if new_rect == None:
+
+            return
+
+        self.button_rects[button] = new_rect.copy()
+
+        for cell in self.__grid_cells(new_rect):
+
+            self.button_grid.setdefault(cell, list()).append(button)
+
+    def __grid_cells (self, rect):
+        """
+        List the grid cells an area touches. The right and bottom edges count
+        as part of the area, like in is_clicked.
+
+        Positional Arguments:
+            rect (pygame.Rect): Area to find the cells for.
+
+        Returns:
+            list: (column, row) of every cell the area touches.
+        """
+
+        first_column = rect.x // GRID_CELL_SIZE
+        last_column = (rect.x + rect.width) // GRID_CELL_SIZE
+        first_row = rect.y // GRID_CELL_SIZE
+        last_row = (rect.y + rect.height) // GRID_CELL_SIZE
+
+        return [(column, row) for column in range(first_column, last_column + 1)
+                              for row in range(first_row, last_row + 1)]
+
+    def __blit_elements (self, surface, baking = False):
+        """
+        Blit every element of the page onto a surface, with a spinner over
+        busy buttons.
+
+        Positional Arguments:
+            surface (pygame.Surface): Surface to blit the elements to.
+
+        Keyword Arguments:
+            baking (boolean): True to leave out busy buttons, which change
+                              every frame. Default is False.
+        """
+
+        for element in self.elements:
+
+            busy = element in self.button_order and element.is_busy()
+
+            if busy and baking:
+
+                continue
+
+            surface.blit(element.image, [element.rect.x, element.rect.y])
+            self.blit_count += 1
+
+            if busy:
+
+                draw_spinner(surface, element.rect)
+
+    def __get_baked_surface (self, screen, background_color):
+        """
+        Get the pre-drawn copy of the page, drawing it again if an element
+        changed or the screen size or background color is different.
+
+        Positional Arguments:
+            screen (pygame.Surface): Surface the page will be shown on.
+            background_color (list): Background color of the page.
+
+        Returns:
+            pygame.Surface: Background and elements of the page.
+        """
+
+        if self.baked_surface == None or \
+           self.baked_surface.get_size() != screen.get_size() or \
+           self.baked_background_color != list(background_color):
+
+            self.baked_surface = pygame.Surface(screen.get_size()).convert(screen)
+            self.baked_background_color = list(background_color)
+
+            self.baked_surface.fill(background_color)
+            self.__blit_elements(self.baked_surface, baking = True)
+
+        return self.baked_surface
+
+class MenuLoader:
+    """
+    Builds the pages of a MenuManager from a menu definition file, so menus
+    can be changed without touching the game's code. The file is JSON, or
+    TOML if it ends in .toml (needs Python 3.11 or newer):
+
+        {
+            "start_page": "home",
+            "background_color": [0, 0, 0],
+            "fonts": {"big": ["Arial", 40], "small": ["Arial", 20]},
+            "pages": [
+                {"id": "home", "pos": [20, 300], "spacing": 5,
+                 "elements": [
+                    {"type": "button_text", "text": "PLAY", "font": "big",
+                     "actions": ["exit_menu"]},
+                    {"type": "button_text", "text": "OPTIONS", "font": "big",
+                     "actions": [{"action": "navigate",
+                                  "args": ["options"]}]},
+                    {"type": "picture", "image": "logo.png", "pos": [20, 20]}
+                 ]}
+            ]
+        }
+
+    Element types are "button_text", "button_picture", "text" and "picture",
+    and take the same options as the element classes. Fonts are a name from
+    "fonts", or a [name, size, bold, italic] list for the font registry.
+    Elements without a "pos" are stacked in a column starting at the "pos"
+    of the page, "spacing" pixels apart. Elements with a "pos" do not move
+    the column. Image and font files are found relative to the definition
+    file.
+
+    Actions are given by name. The names navigate, back, replace,
+    reset_to_start, exit_menu and kill_program call the MenuManager methods,
+    other names are looked up in the actions given to the loader. An action
+    is a name, or a dict with "action", and optionally "args", "kwargs", and
+    "background" and "callback" for background actions.
+
+    Parsing and checking the file is only done when it changed. The checked
+    definition is saved as JSON to a cache file next to it, with a hash of
+    the file, and later loads read the cache instead. The checked definition
+    only holds lists, dicts, strings, numbers, booleans and None, so nothing
+    in the cache file can run code.
+
+    The loader remembers the pages and elements it built, so a changed
+    definition can be applied to the running menu with reload. Pages are
+    matched by id, and elements by their "id", or by their place on the page
+    if they have none. Only pages that changed are checked and updated,
+    elements whose text or actions changed are updated in place, and only
+    elements with other changes, or whose font file changed, are built again.
+    They are built before any page is changed, so an image or font file that
+    can not be loaded is reported like a mistake in the definition. Changed
+    image files are loaded again and given to the elements using them.
+
+    Attributes:
+        manager (MenuManager): Menu manager the pages are added to.
+        actions (dict): Functions the definition can use as actions, by name.
+        filename (string): Path of the definition file, or None if nothing
+                           was loaded yet.
+        cache_filename (string): Path of the cache file.
+        definition (dict): The checked definition. See __check_definition.
+        raw_fonts (dict): Fonts as they were in the definition file when it
+                          was last parsed.
+        raw_pages (dict): Pages as they were in the definition file when it
+                          was last parsed, so unchanged pages are not checked
+                          again. Maps page ids, as strings, to (page as in
+                          the file, checked page) pairs.
+        source_hash (string): SHA-256 hash of the definition file.
+        pages (dict): Pages built by the loader. Maps page ids to pages.
+        elements (dict): Elements built by the loader, in page order. Maps
+                         page ids to lists of (checked definition, element)
+                         pairs.
+        file_stamps (dict): Files watched by check_for_changes. Maps the
+                            definition file and the image and font files it
+                            uses to their (modification time, size), or None
+                            if the file is missing.
+        last_check (float): time.perf_counter() time of the last check for
+                            changed files.
+        reloading (boolean): True while reload is reading a definition.
+                             Mistakes in it are reported without exiting.
+    """
+
+    def __init__ (self, manager, actions = None):
+        """
+        Instantiate a MenuLoader object.
+
+        Positional Arguments:
+            manager (MenuManager): Menu manager to add the pages to.
+
+        Keyword Arguments:
+            actions (dict): Functions the definition can use as actions, by
+                            name. Default is None, for only the MenuManager
+                            actions.
+        """
+
+        self.manager = manager
+        self.actions = {"navigate": manager.navigate, "back": manager.back,
+                        "replace": manager.replace,
+                        "reset_to_start": manager.reset_to_start,
+                        "exit_menu": manager.exit_menu,
+                        "kill_program": manager.kill_program}
+        self.actions.update(actions or dict())
+        self.filename = None
+        self.cache_filename = None
+        self.definition = None
+        self.raw_fonts = None
+        self.raw_pages = dict()
+        self.source_hash = None
+        self.pages = dict()
+        self.elements = dict()
+        self.file_stamps = dict()
+        self.last_check = time.perf_counter()
+        self.reloading = False
+
+    def load (self, filename, cache_filename = None):
+        """
+        Read a menu definition file, from its cache if the file did not
+        change, and add its pages to the menu manager.
+
+        Positional Arguments:
+            filename (string): Path of the definition file.
+
+        Keyword Arguments:
+            cache_filename (string): Path of the cache file. Default is None,
+                                     for the definition file's path with
+                                     ".cache" added.
+
+        Returns:
+            list: The new pages.
+        """
+
+        self.filename = filename
+        self.cache_filename = cache_filename or filename + MENU_CACHE_SUFFIX
+
+        self.definition = self.read_definition()
+        self.__check_references(self.definition)
+
+        pages = [self.build_page(page) for page in self.definition["pages"]]
+
+        for page in pages:
+
+            self.manager.add_page(page)
+
+        if self.definition["background_color"] != None:
+
+            self.manager.set_background_color(
+                self.definition["background_color"])
+
+        if self.definition["start_page"] != None:
+
+            self.manager.set_start_page(self.definition["start_page"])
+
+        self.__watch_files()
+
+        return pages
+
+    def check_for_changes (self):
+        """
+        Reload the menus if the definition file, or an image or font file it
+        uses, changed since the last check. Checking only looks at the
+        modification times of the files, and is skipped if the last check was
+        less than HOT_RELOAD_INTERVAL milliseconds ago, so it can be called
+        every frame.
+
+        Returns:
+            boolean: True if the pages were updated.
+        """
+
+        now = time.perf_counter()
+
+        if self.filename == None or \
+           (now - self.last_check) * 1000 < HOT_RELOAD_INTERVAL:
+
+            return False
+
+        self.last_check = now
+
+        stamps = {path: self.__get_stamp(path) for path in self.file_stamps}
+        changed_files = [path for path, stamp in stamps.items()
+                         if stamp != self.file_stamps[path]]
+
+        if not changed_files:
+
+            return False
+
+        self.file_stamps = stamps
+
+        return self.reload(changed_files)
+
+    def reload (self, changed_files = None):
+        """
+        Apply the definition file as it is now to the pages built by the
+        loader. The current page and navigation history of the menu manager
+        are kept. Pages that were removed from the definition are removed
+        from the menu manager. If the definition has a mistake, or an image
+        or font file of a new element can not be loaded, it is reported and
+        the menus are left as they are.
+
+        Keyword Arguments:
+            changed_files (list): Paths of the files that changed, as found
+                                  in file_stamps. Image files in the list are
+                                  loaded again, and elements using font files
+                                  in the list are built again. The definition
+                                  file is only read again if it is in the
+                                  list. Default is None, for only the
+                                  definition file.
+
+        Returns:
+            boolean: True if the pages were updated.
+        """
+
+        if changed_files == None:
+
+            changed_files = [self.filename]
+
+        changed_files = set(changed_files)
+        definition = self.definition
+        self.reloading = True
+
+        try:
+
+            if self.filename in changed_files:
+
+                definition = self.read_definition()
+                self.__check_references(definition, self.definition)
+
+            for path in changed_files:
+
+                font_registry.reload(path)
+
+                try:
+
+                    image_cache.reload(path)
+
+                except pygame.error as error:
+
+                    print("Error in MenuLoader: Can not load " + path + ", " +
+                          str(error) + ". Keeping the old image.")
+
+            changes = self.__build_changes(definition, changed_files)
+
+        except ValueError:
+
+            return False
+
+        finally:
+
+            self.reloading = False
+
+        self.__apply_definition(definition, changes, changed_files)
+        self.__watch_files()
+
+        return True
+
+    def read_definition (self):
+        """
+        Get the checked definition of the definition file, from the cache if
+        it holds the definition for the file as it is now. The cache is not
+        read while reloading.
+
+        Returns:
+            dict: The checked definition.
+        """
+
+        try:
+
+            with open(self.filename, 'rb') as f:
+
+                source = f.read()
+
+        except OSError:
+
+            if self.reloading:
+
+                self.__error("Can not read the file")
+
+            print("Error in MenuLoader: Can not read menu file, " +
+                  str(self.filename) + "!")
+            exit(-1)
+
+        self.source_hash = hashlib.sha256(source).hexdigest()
+
+        # While reloading, unchanged pages are not checked again, which is
+        # faster than reading the whole cache file
+        if not self.reloading:
+
+            definition = self.__read_cache()
+
+            if definition != None:
+
+                return definition
+
+        definition = self.__check_definition(self.__parse(source))
+        self.__write_cache(definition)
+
+        return definition
+
+    def build_page (self, page_definition):
+        """
+        Make a page from its checked definition.
+
+        Positional Arguments:
+            page_definition (dict): Checked definition of the page.
+
+        Returns:
+            Page: The new page.
+        """
+
+        entries = [(element_definition, self.build_element(element_definition))
+                   for element_definition in page_definition["elements"]]
+
+        return self.__make_page(page_definition, entries)
+
+    def build_element (self, element_definition):
+        """
+        Make an element from its checked definition.
+
+        Positional Arguments:
+            element_definition (dict): Checked definition of the element.
+
+        Returns:
+            Element: The new element.
+        """
+
+        kind = element_definition["type"]
+        pos = element_definition["pos"] or [0, 0]
+
+        if kind in ("picture", "button_picture"):
+
+            image = self.__find_file(element_definition["image"])
+            colorkey = element_definition["colorkey"]
+
+            if kind == "picture":
+
+                return Picture(image, pos = pos, colorkey = colorkey)
+
+            element = ButtonPicture(image, pos = pos, colorkey = colorkey)
+
+        else:
+
+            font = list(element_definition["font"])
+            font[0] = self.__find_file(font[0])
+
+            if kind == "text":
+
+                return Text(element_definition["text"], tuple(font),
+                            pos = pos, color = element_definition["color"],
+                            antialias = element_definition["antialias"],
+                            background_color =
+                                element_definition["background_color"])
+
+            element = ButtonText(element_definition["text"], tuple(font),
+                                 pos = pos, color = element_definition["color"],
+                                 background_color =
+                                     element_definition["background_color"],
+                                 antialias = element_definition["antialias"])
+
+        self.__add_actions(element, element_definition["actions"])
+
+        return element
+
+    def __add_actions (self, button, actions):
+        """
+        Give a button the actions of its checked definition.
+
+        Positional Arguments:
+            button (ButtonMixin): The button.
+            actions (list): Checked actions of the button.
+        """
+
+        for action in actions:
+
+            function = self.__get_action(action["action"])
+
+            if action["background"]:
+
+                callback = None
+
+                if action["callback"] != None:
+
+                    callback = self.__get_action(action["callback"])
+
+                button.add_background_action(function, callback,
+                                             *action["args"],
+                                             **action["kwargs"])
+
+            else:
+
+                button.add_action(function, *action["args"],
+                                  **action["kwargs"])
+
+    def __make_page (self, page_definition, entries):
+        """
+        Make a page out of built elements and remember it.
+
+        Positional Arguments:
+            page_definition (dict): Checked definition of the page.
+            entries (list): (checked definition, element) pairs, in order.
+
+        Returns:
+            Page: The new page.
+        """
+
+        page = Page(page_definition["id"], baked = page_definition["baked"])
+
+        self.__fill_page(page, page_definition, entries)
+
+        self.pages[page.id] = page
+        self.elements[page.id] = entries
+
+        return page
+
+    def __fill_page (self, page, page_definition, entries):
+        """
+        Add elements to a page, stacking the ones without a position in a
+        column.
+
+        Positional Arguments:
+            page (Page): The page, without elements.
+            page_definition (dict): Checked definition of the page.
+            entries (list): (checked definition, element) pairs, in order.
+        """
+
+        next_pos = page_definition["pos"]
+
+        for element_definition, element in entries:
+
+            if element_definition["pos"] == None:
+
+                element.set_pos(next_pos)
+                next_pos = [next_pos[0],
+                            element.rect.bottom + page_definition["spacing"]]
+
+            else:
+
+                element.set_pos(element_definition["pos"])
+
+            page.add_element(element)
+
+    def __build_changes (self, definition, changed_files):
+        """
+        Build the elements of the pages a new definition adds, and the
+        elements it changes too much to update in place, without changing any
+        page. Files that can not be loaded are reported like a mistake in the
+        definition.
+
+        Positional Arguments:
+            definition (dict): The new checked definition.
+            changed_files (set): Paths of the files that changed.
+
+        Returns:
+            dict: Maps the ids of the pages to add or update to lists of
+                  (checked definition, old (checked definition, element) pair
+                  or None, new element or None) tuples, in order. The new
+                  element is None if the old one is updated in place.
+        """
+
+        old_pages = {page_definition["id"]: page_definition
+                     for page_definition in self.definition["pages"]}
+        changed_files = changed_files - {self.filename}
+        changes = dict()
+
+        for page_definition in definition["pages"]:
+
+            page_id = page_definition["id"]
+            old_elements = dict()
+
+            if page_id in self.pages:
+
+                if page_definition == old_pages.get(page_id) and \
+                   not (changed_files and any(
+                       self.__element_files(element_definition) &
+                       changed_files for element_definition
+                       in page_definition["elements"])):
+
+                    continue
+
+                old_elements = {self.__element_key(element_definition, index):
+                                (element_definition, element)
+                                for index, (element_definition, element)
+                                in enumerate(self.elements[page_id])}
+
+            changes[page_id] = list()
+
+            for index, element_definition in enumerate(
+                    page_definition["elements"]):
+
+                old_entry = old_elements.pop(
+                    self.__element_key(element_definition, index), None)
+                element = None
+
+                if self.__needs_build(old_entry, element_definition,
+                                      changed_files):
+
+                    try:
+
+                        element = self.build_element(element_definition)
+
+                    except (pygame.error, OSError) as error:
+
+                        # Give back the images of the elements built so far
+                        for page_changes in changes.values():
+
+                            for change in page_changes:
+
+                                if hasattr(change[2], "release_image"):
+
+                                    change[2].release_image()
+
+                        self.__error("Can not build page " + str(page_id) +
+                                     " element " + str(index) + ", " +
+                                     str(error))
+
+                changes[page_id].append((element_definition, old_entry,
+                                         element))
+
+        return changes
+
+    def __apply_definition (self, definition, changes, changed_files):
+        """
+        Update the pages built by the loader to a new definition.
+
+        Positional Arguments:
+            definition (dict): The new checked definition.
+            changes (dict): Pages to add or update, from __build_changes.
+            changed_files (set): Paths of the image and font files that
+                                 changed.
+        """
+
+        page_ids = set()
+
+        for page_definition in definition["pages"]:
+
+            page_id = page_definition["id"]
+            page_ids.add(page_id)
+
+            if page_id not in changes:
+
+                continue
+
+            entries = [(element_definition, element or
+                        self.__update_element(old_entry, element_definition,
+                                              changed_files))
+                       for element_definition, old_entry, element
+                       in changes[page_id]]
+
+            if page_id in self.pages:
+
+                self.__update_page(page_definition, entries)
+
+            else:
+
+                self.manager.add_page(self.__make_page(page_definition,
+                                                       entries))
+
+        if definition["background_color"] != None and \
+           definition["background_color"] != self.manager.background_color:
+
+            self.manager.set_background_color(definition["background_color"])
+
+        # Set the new start page first, so removing the old one keeps it
+        if definition["start_page"] != None and \
+           self.manager.start_page is not self.pages[definition["start_page"]]:
+
+            self.manager.set_start_page(definition["start_page"], show = False)
+
+        for page_id in list(self.pages):
+
+            if page_id not in page_ids:
+
+                del self.pages[page_id]
+                del self.elements[page_id]
+
+                self.manager.remove_page(page_id)
+
+        self.definition = definition
+
+    def __update_page (self, page_definition, entries):
+        """
+        Update a page built by the loader to its new definition and elements.
+
+        Positional Arguments:
+            page_definition (dict): New checked definition of the page.
+            entries (list): (checked definition, element) pairs, in order.
+        """
+
+        page = self.pages[page_definition["id"]]
+        old_entries = self.elements[page.id]
+
+        page.clear()
+        page.set_baked(page_definition["baked"])
+
+        self.__fill_page(page, page_definition, entries)
+        self.elements[page.id] = entries
+
+        # Give back the images of the elements that were replaced
+        kept = set(element for element_definition, element in entries)
+
+        for element_definition, element in old_entries:
+
+            if element not in kept and hasattr(element, "release_image") and \
+               not element.pages:
+
+                element.release_image()
+
+    def __needs_build (self, old_entry, element_definition, changed_files):
+        """
+        Check if an element has to be built again, because it is new or more
+        than its text, actions or image file changed.
+
+        Positional Arguments:
+            old_entry (tuple): (checked definition, element) of the element
+                               as it is, or None for a new element.
+            element_definition (dict): New checked definition of the element.
+            changed_files (set): Paths of the image and font files that
+                                 changed.
+
+        Returns:
+            boolean: True if the element has to be built.
+        """
+
+        if old_entry == None:
+
+            return True
+
+        old_definition, element = old_entry
+
+        # The position is set when the page is filled
+        changes = set(key for key in element_definition
+                      if key != "pos" and
+                      element_definition[key] != old_definition.get(key))
+
+        return bool(changes - {"text", "actions"}) or \
+               (isinstance(element, (ButtonText, Text)) and
+                bool(self.__element_files(element_definition) & changed_files))
+
+    def __update_element (self, old_entry, element_definition,
+                          changed_files):
+        """
+        Update an element in place to its new definition. Only its text,
+        actions and image file can have changed. See __needs_build.
+
+        Positional Arguments:
+            old_entry (tuple): (checked definition, element) of the element
+                               as it is.
+            element_definition (dict): New checked definition of the element.
+            changed_files (set): Paths of the image and font files that
+                                 changed.
+
+        Returns:
+            Element: The updated element.
+        """
+
+        old_definition, element = old_entry
+
+        if self.__element_files(element_definition) & changed_files:
+
+            element.replace_image(image_cache.convert(element.filename,
+                                                      element.colorkey))
+
+        if element_definition.get("text") != old_definition.get("text"):
+
+            if isinstance(element, ButtonText):
+
+                element.set_text(element_definition["text"])
+
+            else:
+
+                element.set_text(element_definition["text"], element.font,
+                                 element.color, element.antialias,
+                                 element.background_color)
+
+        if element_definition.get("actions") != old_definition.get("actions"):
+
+            element.actions = list()
+            self.__add_actions(element, element_definition["actions"])
+
+        return element
+
+    def __element_key (self, element_definition, index):
+        """
+        Key that matches an element to its old version on the same page: its
+        id, or its place on the page if it has no id.
+        """
+
+        if element_definition["id"] != None:
+
+            return ("id", element_definition["id"])
+
+        return ("index", index)
+
+    def __element_files (self, element_definition):
+        """
+        Paths an element's image or font file would have, relative to the
+        definition file.
+
+        Returns:
+            set: The paths. Empty for system fonts and pygame's default font.
+        """
+
+        name = self.__element_file_name(element_definition)
+
+        if name == None:
+
+            return set()
+
+        return {os.path.join(os.path.dirname(self.filename), name)}
+
+    def __element_file_name (self, element_definition):
+        """
+        Name of an element's image or font file, as it is in the definition.
+
+        Returns:
+            string: The name, or None for pygame's default font.
+        """
+
+        if "image" in element_definition:
+
+            return element_definition["image"]
+
+        return element_definition["font"][0]
+
+    def __watch_files (self):
+        """
+        Watch the definition file and the image and font files of the
+        current definition, keeping the stamps of files already watched.
+        """
+
+        names = set()
+
+        for page_definition in self.definition["pages"]:
+
+            for element_definition in page_definition["elements"]:
+
+                names.add(self.__element_file_name(element_definition))
+
+        names.discard(None)
+
+        # Many elements share a file, so each one is only looked for once
+        folder = os.path.dirname(self.filename)
+        files = {path for path in (os.path.join(folder, name)
+                                   for name in names) if os.path.isfile(path)}
+        files.add(self.filename)
+
+        self.file_stamps = {path: self.file_stamps[path]
+                            if path in self.file_stamps
+                            else self.__get_stamp(path) for path in files}
+
+    def __get_stamp (self, path):
+        """
+        Get the modification time and size of a file, or None if it is
+        missing.
         """
 
-        return self.text
+        try:
 
-    def set_text (self, new_text, new_font = DEFAULT_FONT,
-                  new_color = DEFAULT_TEXT_COLOR, new_antialias = True,
-                  new_background_color = None):
+            info = os.stat(path)
+
+        except OSError:
+
+            return None
+
+        return (info.st_mtime_ns, info.st_size)
+
+    def __check_references (self, definition, old_definition = None):
         """
-        Set a new string as the text. Maintains the x and y position of the
-        original text.
+        Check that the actions and image files a definition uses exist, and
+        that its new pages do not take the id of a page the loader did not
+        build, so building its pages can not fail halfway through, and these
+        are reported like any other mistake in the definition.
 
         Positional Arguments:
-            text (String): Text to be rendered.
-            font (pygame.font): Font used to render the text.
+            definition (dict): The checked definition.
 
         Keyword Arguments:
-            pos (tuple): Position of the text.
-            color (List): Color of the text.
-            antialias (Boolean): Adds antialias to text.
-            background_color (List): Background color of the text.
+            old_definition (dict): Checked definition the pages were built
+                                   from. Pages it has unchanged, as the same
+                                   object, were checked already. Default is
+                                   None, to check every page.
         """
 
-        # Store the current position
-        temp_old_pos = self.get_pos()
+        old_pages = dict()
+        image_files = set()
 
-        # Re-render the text, setting image and rect
-        self.image = font.render(str(new_text), new_antialias, new_color, \
-                                 new_background_color)
-        self.image.set_colorkey(BLACK)
-        self.rect = self.image.get_rect()
+        if old_definition != None:
 
-        # Set the x and y position using the old position
-        self.rect.x = temp_old_pos[0]
-        self.rect.y = temp_old_pos[1]
+            old_pages = {page_definition["id"]: page_definition
+                         for page_definition in old_definition["pages"]}
 
-class MenuManager:
-    """
-    Menu manager for pygame.
+        for page_definition in definition["pages"]:
 
-    Attributes:
-        pages (List): List of pages in the menu manager.
-        current_page (Page): Page currently being displayed.
-        screen (pygame.display): Surface to blit the pages and game to.
-        clock (pygame.time.Clock): Used to set/cap game FPS.
-        start_page_set (Boolean): Switch that checks if start page has been set.
-    """
+            page_id = page_definition["id"]
 
-    def __init__ (self, screen, clock):
-        """
-        Instantiate a MenuManager object.
+            if page_definition is old_pages.get(page_id):
 
-        Positional Arguments:
-            screen (pygame.Surface): Surface we are blitting objects to.
-            clock (pygame.time.Clock): Pygame clock.
+                continue
 
-        Keyword Arguments:
-            background_color (list): Background color for the menu system.
-                                     Should be supplied as a list of three
-                                     integers. Default is black.
+            if page_id not in self.pages and \
+               (page_id in self.manager.page_registry or
+                page_id in self.manager.page_factories):
 
-        NOTE: For the menu manager system to work as intended, you will want to
-              use the same screen and clock objects for the menu manager and
-              your game.
-        """
+                self.__error("Page id " + str(page_id) + " is already used " +
+                             "by another page")
 
-        self.screen = screen
-        self.clock = clock
-        self.background_color = DEFAULT_MENU_BACKGROUND_COLOR
-        self.pages = list()
-        self.current_page = None
-        self.start_page = None
-        self.exiting = False
-        self.screen_width, self.screen_height = pygame.display.get_surface().get_size()
-        self.highscore_list = list()
-        self.num_highscores = 5
+            for element_definition in page_definition["elements"]:
 
-    def run (self):
-        """
-        Update and display the menu system. Puts the menu loop into a function
-        for ease of use.
-        """
+                if "image" in element_definition and \
+                   element_definition["image"] not in image_files:
 
-        while self.__update():
+                    if not os.path.isfile(
+                            self.__find_file(element_definition["image"])):
 
-            self.__display()
+                        self.__error("Can not find image file " +
+                                     element_definition["image"])
 
-    def add_page (self, new_page):
-        """
-        Adds a page to the menu manager.
+                    image_files.add(element_definition["image"])
 
-        Arguments:
-            new_page (Page): Page to be added to the menu manager.
-        """
+                for action in element_definition.get("actions", list()):
 
-        self.pages.append(new_page)
+                    self.__get_action(action["action"])
 
-    def set_start_page (self, page_id):
-        """
-        Set a start page for the menu manager. This function must be called
-        before calling ManuManager.run() or the program will be terminated.
+                    if action["callback"] != None:
 
-        Arguments:
-            page_id (String/Int): ID of the desired page destination.
+                        self.__get_action(action["callback"])
 
-        NOTE: See Page class for more info on page id's.
+    def __get_action (self, name):
         """
+        Find an action function by name.
 
-        for page in self.pages:
+        Positional Arguments:
+            name (string): Name of the action.
 
-            if (page_id == page.id):
+        Returns:
+            function: The action function.
+        """
 
-                self.current_page = page
-                self.start_page = page
-                return
+        if name not in self.actions:
 
-        print("Invalid start page id!")
-        exit(-1)
+            self.__error("Unknown action, " + str(name))
 
-    def set_background_color (self, color):
+        return self.actions[name]
+
+    def __find_file (self, name):
         """
-        Sets the background color for the menu pages.
+        Find an image or font file relative to the definition file. Names that
+        are not files there, such as system font names, are kept as they are.
 
         Positional Arguments:
-            color (List): Background color for menu pages. List of 3 integers
-                          ranging from 0 to 255 inclusive.
+            name (string): Path or name from the definition.
+
+        Returns:
+            string: Path to use.
         """
 
-        # Type check
-        if not (type(color) is list):
+        if name == None:
 
-            print("Error in set_background_color: Background color is not list!")
-            exit(-1)
+            return None
 
-        if (len(color) != 3):
+        path = os.path.join(os.path.dirname(self.filename), name)
 
-            print("Error in set_backgro")
-            exit(-1)
+        if os.path.isfile(path):
 
-        self.background_color = color
+            return path
 
-    def navigate (self, page_id):
+        return name
+
+    def __parse (self, source):
         """
-        Sets the currently showing page using the id attribute of Page class.
+        Parse the definition file.
 
-        Arguments:
-            page_id (String/Int): ID of the desired page destination.
+        Positional Arguments:
+            source (bytes): Contents of the definition file.
 
-        NOTE: See Page class for more info on page id's.
+        Returns:
+            dict: The definition as it is in the file.
         """
 
-        for page in self.pages:
+        is_toml = self.filename.lower().endswith(".toml")
 
-            if page.id == page_id:
+        if is_toml and tomllib == None:
 
-                self.current_page = page
+            self.__error("TOML menu files need Python 3.11 or newer")
 
-                return
+        try:
 
-        print("Invalid page id, " + str(page_id) + "! Exiting.")
-        exit(-1)
+            if is_toml:
 
-    def exit_menu (self):
-        """
-        For exiting the menu manager. Flips the exiting flag.
-        """
+                return tomllib.loads(source.decode("utf-8"))
 
-        self.exiting = True
+            return json.loads(source.decode("utf-8"))
 
-    def kill_program (self):
-        """
-        Terminates the entire program.
-        """
+        except ValueError as error:
 
-        exit()
+            self.__error("Can not parse the file: " + str(error))
 
-    def add_highscore_page (self, button, back_page_id, font,
-                            num_highscores = 5):
+    def __check_definition (self, raw):
         """
-        Adds a highscore page to the MenuManager.
+        Check that a parsed definition is valid and fill in the defaults.
+        Pages that are the same as when the file was last parsed keep their
+        checked page, and are not checked again.
 
         Positional Arguments:
-            button (ButtonText, ButtonPicture): The button you want to use to
-                                                navigate to the highscore page.
-            back_page_id (Page): The highscore page has a back button.
-                                 "back_page_id" should be the ID of the page you
-                                 want to return to when the back button is
-                                 pressed.
-            font (pygame.font.Font/Sysfont): Font used to render the Text
-                                             objects on the highscore page.
+            raw (dict): The definition as it is in the file.
 
-        Prerequisites:
-            - The button passed as the "button" argument should be of type
-              ButtonText or ButtonPicture.
-            - The page with ID back_page_id should be a page that is already in
-              the MenuManager.
+        Returns:
+            dict: The checked definition, with "start_page",
+                  "background_color" and "pages" keys. Every page has "id",
+                  "baked", "pos", "spacing" and "elements", and every element
+                  has every option of its type, with actions as dicts with
+                  "action", "args", "kwargs", "background" and "callback".
         """
 
-        # Save highscore stuff to the MenuManager instance
-        self.num_highscores = num_highscores
+        if not isinstance(raw, dict):
 
-        # Create the highscore page
-        highscore_page = Page("highscores")
+            self.__error("The file has to hold an object")
 
-        # Add navigation action to the button
-        button.add_action(self.navigate, "highscores")
+        raw_fonts = raw.get("fonts", dict())
 
-        # Read in scores and usernames and create corresponding UI elements
-        self.__import_highscores()
+        if not isinstance(raw_fonts, dict):
 
-        # Add the page to the MenuManager
-        self.add_page(highscore_page)
+            self.__error("fonts has to be an object")
 
-    def save_highscore (self, user, score):
-        """
-        Saves a score to the highscores file.
+        fonts = {name: self.__check_font(font, dict(), name)
+                 for name, font in raw_fonts.items()}
 
-        Positional Arguments:
-            user (string): Username of the player.
-            score (int): Score the player got.
-            hs_score_file (string): Path to the file where highscores are saved.
-        """
+        pages = raw.get("pages")
 
-        # Read contents from file
-        f = open(HIGHSCORE_FILE, 'r')
-        contents = f.readlines()
-        f.close()
+        if not isinstance(pages, list) or not pages:
 
-        # Find the index of where this score goes
-        index = 0
+            self.__error("pages has to be a list of pages")
 
-        for line in contents:
+        # Pages as they were when the file was last parsed, with the same
+        # fonts, were checked then
+        old_pages = dict()
+        raw_pages = dict()
+        checked_pages = list()
 
-            user_score = line.strip().split(" ")
+        if raw_fonts == self.raw_fonts:
 
-            if len(user_score) == 2:
+            old_pages = self.raw_pages
 
-                f_user = user_score[0]
-                f_score = int(user_score[1])
+        for page in pages:
 
-                if score < f_score:
+            key = str(page.get("id")) if isinstance(page, dict) else None
+            old_page = old_pages.get(key)
 
-                    index += 1
+            if old_page != None and old_page[0] == page:
 
-        # Add the score to whatever index it should be at
-        contents.insert(index, f"{user} {score}\n")
+                checked_page = old_page[1]
 
-        # Add the score to the highscore list in the MenuManager
-        self.highscore_list.insert(index, [user, score])
+            else:
 
-        # Make sure we don't exceed the maximum number of scores we are allowed
-        # to save
-        if len(contents) > self.num_highscores:
+                checked_page = self.__check_page(page, fonts)
 
-            contents = contents[0:self.num_highscores]
+            raw_pages[key] = (page, checked_page)
+            checked_pages.append(checked_page)
 
-        # Write the new contents to the highscore file
-        f = open(HIGHSCORE_FILE, 'w')
-        contents = "".join(contents)
-        f.write(contents)
-        f.close()
+        definition = {
+            "start_page": raw.get("start_page"),
+            "background_color": self.__check_color(
+                raw.get("background_color"), "background_color", True),
+            "pages": checked_pages
+        }
 
-        self.__import_highscores()
+        page_ids = [page["id"] for page in definition["pages"]]
 
-    def __import_highscores (self):
+        if len(set(page_ids)) != len(page_ids):
+
+            self.__error("Two pages have the same id")
+
+        if definition["start_page"] != None and \
+           definition["start_page"] not in page_ids:
+
+            self.__error("start_page is not a page")
+
+        self.raw_fonts = raw_fonts
+        self.raw_pages = raw_pages
+
+        return definition
+
+    def __check_page (self, raw, fonts):
         """
-        Read in highscores from the highscore file and create the UI elements
-        for those usernames and highscores.
+        Check the definition of a page and its elements.
+
+        Positional Arguments:
+            raw (dict): The page as it is in the file.
+            fonts (dict): Checked fonts, by name.
+
+        Returns:
+            dict: The checked page.
         """
 
-        highscore_page = None
+        if not isinstance(raw, dict) or "id" not in raw:
 
-        for page in self.pages:
+            self.__error("Every page has to be an object with an id")
 
-            if page.get_id() == "highscores":
+        where = "page " + str(raw["id"])
+        elements = raw.get("elements", list())
 
-                highscore_page = page
-                highscore_page.clear()
+        if not isinstance(elements, list):
 
-        # Fetch the highscores and usernames from the highscores.txt file
-        users = []
-        scores = []
+            self.__error("elements of " + where + " has to be a list")
 
-        with open(HIGHSCORE_FILE, 'r') as f:
+        spacing = raw.get("spacing", 0)
 
-            contents = f.readlines()
+        if not isinstance(spacing, (int, float)):
 
-            for line in contents:
+            self.__error("spacing of " + where + " has to be a number")
 
-                user_score = line.strip().split(" ")
+        return {"id": raw["id"], "baked": bool(raw.get("baked", False)),
+                "pos": self.__check_pos(raw.get("pos", [0, 0]), where),
+                "spacing": int(spacing),
+                "elements": [self.__check_element(element, fonts, where +
+                                                  " element " + str(index))
+                             for index, element in enumerate(elements)]}
 
-                print(user_score)
+    def __check_element (self, raw, fonts, where):
+        """
+        Check the definition of an element and fill in its defaults.
 
-                if len(user_score) == 2:
+        Positional Arguments:
+            raw (dict): The element as it is in the file.
+            fonts (dict): Checked fonts, by name.
+            where (string): Where the element is, for error messages.
 
-                    users.append(user_score[0])
-                    scores.append(user_score[1])
+        Returns:
+            dict: The checked element.
+        """
 
-                    # Save the score to self.highscore_list
-                    self.highscore_list.append([str(user_score[0]), \
-                                                int(user_score[1])])
+        if not isinstance(raw, dict) or raw.get("type") not in \
+           MENU_ELEMENT_TYPES:
 
-        screen_center_x = self.screen_width / 2
-        vert_division = self.screen_height / (num_highscores + 1)
+            self.__error(where + " has to be an object with a type out of " +
+                         ", ".join(MENU_ELEMENT_TYPES))
 
-        # Create UI elements and add them to the highscore page
-        button_back = ButtonText("Back", font, pos = [10, 10])
-        button_back.add_action(self.navigate, back_page_id)
-        highscore_page.add_element(button_back)
+        kind = raw["type"]
+        element = {"type": kind, "id": raw.get("id"), "pos": None}
 
-        for i in range(len(self.highscore_list)):
+        if "pos" in raw:
 
-            text = str(users[i]) + " " + str(scores[i])
+            element["pos"] = self.__check_pos(raw["pos"], where)
 
-            score = Text(text, font)
+        if kind in ("picture", "button_picture"):
 
-            dims = score.get_dimensions()
-            pos_x = screen_center_x - ((1/2) * dims[0])
-            pos_y = ((i + 1) * vert_division) - ((1/2) * dims[1])
-            score.set_pos([pos_x, pos_y])
+            if not isinstance(raw.get("image"), str):
 
-            highscore_page.add_element(score)
+                self.__error(where + " needs an image file")
 
-    def __display (self):
-        """
-        Blit everything from backend to the screen.
-        """
+            element["image"] = raw["image"]
+            element["colorkey"] = self.__check_color(
+                raw.get("colorkey", DEFAULT_COLORKEY), where, False)
 
-        # Fill background
-        self.screen.fill(self.background_color)
+        else:
 
-        # Display current screen
-        self.current_page.display(self.screen)
-        pygame.display.flip()
-        self.clock.tick(MENU_FPS)
+            if "text" not in raw:
+
+                self.__error(where + " needs a text")
+
+            element["text"] = str(raw["text"])
+            element["font"] = self.__check_font(raw.get("font", DEFAULT_FONT),
+                                                fonts, where)
+            element["color"] = self.__check_color(
+                raw.get("color", DEFAULT_TEXT_COLOR), where, False)
+            element["background_color"] = self.__check_color(
+                raw.get("background_color"), where, True)
+            element["antialias"] = bool(raw.get("antialias", True))
+
+        if kind in ("button_text", "button_picture"):
 
-    def __update (self):
+            actions = raw.get("actions", list())
+
+            if not isinstance(actions, list):
+
+                self.__error("actions of " + where + " has to be a list")
+
+            element["actions"] = [self.__check_action(action, where)
+                                  for action in actions]
+
+        elif "actions" in raw:
+
+            self.__error(where + " is not a button and can not have actions")
+
+        return element
+
+    def __check_action (self, raw, where):
         """
-        Handles user events. Also checks if a start page has been set. This
-        function will prevent the program from running if a sart page has not
-        beem set.
+        Check the definition of an action.
+
+        Positional Arguments:
+            raw (string, dict): The action as it is in the file.
+            where (string): Where the action is, for error messages.
 
         Returns:
-            boolean: True if program execution should continue, False otherwise.
+            dict: The checked action.
         """
 
-        # Ensure start page has been set
-        if self.start_page == None:
+        if isinstance(raw, str):
 
-            print("Start page not set!")
-            exit(-1)
+            raw = {"action": raw}
 
-        # Exit procedures, resets current page to start page
-        if self.exiting:
+        if not isinstance(raw, dict) or not isinstance(raw.get("action"), str):
 
-            self.exiting = False
-            self.current_page = self.start_page
+            self.__error("Every action of " + where + " has to be a name or "
+                         "an object with an action name")
 
-            return False
+        action = {"action": raw["action"], "args": raw.get("args", list()),
+                  "kwargs": raw.get("kwargs", dict()),
+                  "background": bool(raw.get("background", False)),
+                  "callback": raw.get("callback")}
 
-        for event in pygame.event.get():
+        if not isinstance(action["args"], list) or \
+           not isinstance(action["kwargs"], dict):
 
-            # Window close
-            if event.type == pygame.QUIT:
+            self.__error("args and kwargs of the actions of " + where +
+                         " have to be a list and an object")
 
-                self.kill_program()
+        return action
 
-            # Left mouse click
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+    def __check_font (self, raw, fonts, where):
+        """
+        Check a font, which is a name of a checked font or a font registry
+        description.
 
-                mouse_pos = pygame.mouse.get_pos()
+        Positional Arguments:
+            raw (string, list): The font as it is in the file.
+            fonts (dict): Checked fonts, by name.
+            where (string): Where the font is, for error messages.
 
-                for element in self.current_page.elements:
+        Returns:
+            list: Font registry description [name, size, bold, italic]. A
+                  list, so it is the same after going through the JSON cache.
+        """
 
-                    # Check fif we clicked a button type
-                    if isinstance(element, ButtonPicture) or \
-                       isinstance(element, ButtonText):
+        if isinstance(raw, str):
 
-                        if element.is_clicked(mouse_pos):
+            if raw not in fonts:
 
-                            element.execute_actions()
+                self.__error("Unknown font, " + raw + ", in " + where)
 
-        return True
+            return fonts[raw]
 
-class Page:
-    """
-    Page object for menu manager.
+        if not isinstance(raw, (list, tuple)) or not 2 <= len(raw) <= 4 or \
+           not (raw[0] == None or isinstance(raw[0], str)) or \
+           not isinstance(raw[1], int):
 
-    Attributes:
-        id (string/int): ID for this page.
-        elements (list): List of elements on the page.
+            self.__error("Font of " + where + " has to be a font name or a "
+                         "[name, size, bold, italic] list")
 
-    NOTE: The ID doesn't have to be a string/int, it just has to be some
-          distinct identifier for this page. I just recommend using a string or
-          an integer for simplicity and readability.
-    """
+        font = list(raw) + [False] * (4 - len(raw))
 
-    def __init__ (self, id):
+        return [font[0], font[1], bool(font[2]), bool(font[3])]
+
+    def __check_pos (self, raw, where):
         """
-        Instantiate a page object.
+        Check an XY position.
 
         Positional Arguments:
-            id (string/int): ID for this page.
+            raw (list): The position as it is in the file.
+            where (string): Where the position is, for error messages.
+
+        Returns:
+            list: The position.
         """
 
-        self.id = id
-        self.elements = list()
+        if not isinstance(raw, (list, tuple)) or len(raw) != 2 or \
+           not all(isinstance(value, (int, float)) for value in raw):
 
-    def get_id (self):
+            self.__error("pos of " + where + " has to be an [x, y] list")
+
+        return [int(raw[0]), int(raw[1])]
+
+    def __check_color (self, raw, where, optional):
         """
-        Get the ID of the Page.
+        Check a color.
+
+        Positional Arguments:
+            raw (list): The color as it is in the file.
+            where (string): Where the color is, for error messages.
+            optional (boolean): True if the color can be left out.
 
         Returns:
-            id (Int/String): ID of the Page.
+            list: The color, or None if it was left out.
         """
 
-        return self.id
+        if raw == None and optional:
 
-    def get_elements (self):
+            return None
+
+        if not isinstance(raw, (list, tuple)) or len(raw) not in (3, 4) or \
+           not all(isinstance(value, int) and 0 <= value <= 255
+                   for value in raw):
+
+            self.__error("Colors of " + where + " have to be lists of three "
+                         "integers between 0 and 255")
+
+        return list(raw)
+
+    def __read_cache (self):
         """
-        Get the elements in the Page.
+        Read the checked definition from the cache file.
 
         Returns:
-            elements (list): List of elements in the Page.
+            dict: The checked definition, or None if the cache file is
+                  missing, broken, or was made from another version of the
+                  definition file.
         """
 
-        return self.elements
+        try:
 
-    def add_element (self, new_element):
+            with open(self.cache_filename, 'r', encoding = "utf-8") as f:
+
+                cache = json.load(f)
+
+        except (OSError, ValueError):
+
+            return None
+
+        if not isinstance(cache, dict) or \
+           cache.get("version") != MENU_CACHE_VERSION or \
+           cache.get("source_hash") != self.source_hash:
+
+            return None
+
+        return cache["definition"]
+
+    def __write_cache (self, definition):
         """
-        Adds an element to the page.
+        Save the checked definition to the cache file. Not being able to
+        write it only makes the next load slower, so errors are ignored.
 
         Positional Arguments:
-            new_element (Button): Element to add to the page.
+            definition (dict): The checked definition.
         """
 
-        self.elements.append(new_element)
+        cache = {"version": MENU_CACHE_VERSION,
+                 "source_hash": self.source_hash, "definition": definition}
+        temp_filename = self.cache_filename + ".tmp"
 
-    def clear (self):
-        """
-        Removes all elements from the page.
-        """
+        try:
 
-        self.elements = list()
+            # dumps uses the C encoder, which dump does not
+            with open(temp_filename, 'w', encoding = "utf-8") as f:
+
+                f.write(json.dumps(cache))
 
-    def display (self, screen):
+            os.replace(temp_filename, self.cache_filename)
+
+        except OSError:
+
+            pass
+
+    def __error (self, message):
         """
-        Show this screen in the window.
+        Report a mistake in the definition file and exit. While reloading,
+        ValueError is raised instead, so the old menus are kept.
 
         Positional Arguments:
-            screen (pygame.display): Surface to blit the elements to.
+            message (string): What is wrong.
         """
 
-        for element in self.elements:
+        if self.reloading:
 
-            screen.blit(element.image, [element.rect.x, element.rect.y])
+            print("Error in menu file " + str(self.filename) + ": " + message +
+                  "! Keeping the old menus.")
+            raise ValueError(message)
+
+        print("Error in menu file " + str(self.filename) + ": " + message +
+              "! Exiting.")
+        exit(-1)
@@ -0,0 +1,111 @@
+"""
+Pygame Menu System Replay Script
+
+Plays back a menu session recorded with MenuManager.record_input, without
+opening a window and as fast as possible, and prints the frame time stats of
+the replay as JSON. Replaying the same recordings against two versions of the
+menu system shows if frame times got worse.
+
+The menus are built by a function of your game that takes the screen surface
+and returns the MenuManager, with the same pages as when the session was
+recorded:
+
+    python replay_menus.py session.rec my_game:build_menus
+    python replay_menus.py session.rec my_game:build_menus --output after.json
+
+Run it from the dev directory, or any directory my_game can be imported from.
+"""
+
+# Imports
+import os
+
+# No window is needed, and the JSON output must not start with pygame's
+# banner. These have to be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import importlib
+import json
+import sys
+
+import pygame
+
+# Constants
+DEFAULT_SCREEN_SIZE = "800x600"
+
+def load_builder (name):
+    """
+    Find the function that builds the menus.
+
+    Positional Arguments:
+        name (string): "module:function".
+
+    Returns:
+        function: The function.
+    """
+
+    module_name, separator, function_name = name.partition(":")
+
+    if not separator or not module_name or not function_name:
+
+        print("Menu builder has to be given as module:function!")
+        exit(-1)
+
+    # Let modules next to the recording's game be found
+    sys.path.insert(0, os.getcwd())
+
+    module = importlib.import_module(module_name)
+
+    if not hasattr(module, function_name):
+
+        print("No function " + function_name + " in " + module_name + "!")
+        exit(-1)
+
+    return getattr(module, function_name)
+
+def main ():
+    """
+    Replay a recording and print or write the frame time stats as JSON.
+    """
+
+    parser = argparse.ArgumentParser(description = "Replay a recorded menu "
+                                     "session without a window.")
+    parser.add_argument("recording", help = "file written by record_input")
+    parser.add_argument("builder", help = "module:function that takes the "
+                        "screen and returns the MenuManager")
+    parser.add_argument("--size", default = DEFAULT_SCREEN_SIZE,
+                        help = "screen size as WIDTHxHEIGHT")
+    parser.add_argument("--output", help = "write the stats to this file "
+                        "instead of printing them")
+    arguments = parser.parse_args()
+
+    width, separator, height = arguments.size.partition("x")
+
+    if not separator or not width.isdigit() or not height.isdigit():
+
+        print("Screen size has to be given as WIDTHxHEIGHT!")
+        exit(-1)
+
+    pygame.init()
+    screen = pygame.display.set_mode([int(width), int(height)])
+
+    manager = load_builder(arguments.builder)(screen)
+    stats = manager.replay_input(arguments.recording)
+
+    output = json.dumps(stats, indent = 2)
+
+    if arguments.output == None:
+
+        print(output)
+
+    else:
+
+        with open(arguments.output, 'w') as f:
+
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+
+    main()
@@ -1 +1 @@
-from nhefner_pygame_menus.menus import ButtonPicture, ButtonText, Picture, Text, MenuManager, Page
+from nhefner_pygame_menus.menus import Element, ButtonMixin, ButtonPicture, ButtonText, Picture, Text, MenuManager, Page, ImageCache, image_cache, TextRenderCache, text_cache, FontRegistry, font_registry, HighscoreStore, SQLiteLeaderboard, BACKGROUND_ACTION_DONE, background_executor, FrameStats, InputRecorder, load_input_recording, MenuLoader